@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark suite for the binder generation orchestration
+Runs run_binder_generation() end to end on a 40-residue crop of
+af3_tleap.pdb with a deterministic stand-in model, and compares startup
+time, stage latency, throughput, peak memory and I/O volume against
+stored baselines
+
+Usage:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --workers 4 --tolerance 0.5
+  python benchmarks/run_benchmarks.py --update-baselines
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent.resolve()
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import run_telemetry  # noqa: E402
+
+
+STANDIN_SCRIPT = BENCH_DIR / "standin_boltzdesign.py"
+BASELINES_FILE = BENCH_DIR / "baselines.json"
+SOURCE_PDB = REPO_DIR / "_inputs" / "af3_tleap.pdb"
+
+CROP_RESIDUES = 40
+DESIGN_SAMPLES = 2
+LENGTH_RANGE = (20, 30)
+JOBS = 4
+# Fixed rather than CPU-dependent so every baseline measures the same scaling
+DEFAULT_WORKERS = 4
+
+# Metrics where a larger value is better; everything else is a cost
+HIGHER_IS_BETTER = {"throughput_1_worker", "throughput_n_workers", "scaling_efficiency"}
+# Only comparable with a baseline recorded with the same worker count
+WORKER_DEPENDENT = {"throughput_n_workers", "scaling_efficiency"}
+# Reported but not checked against the baseline
+INFORMATIONAL = {"n_workers", "cpu_count"}
+# Sub-second timings are dominated by scheduler noise; allow this much on top
+TIMING_SLACK_SECONDS = 0.1
+
+
+def make_target_crop(pdb_path, output_path, residues=CROP_RESIDUES):
+    """Write the first `residues` residues of a PDB file"""
+    kept = []
+    seen = []
+    with open(pdb_path, "r") as handle:
+        for line in handle:
+            if not line.startswith(("ATOM", "HETATM")):
+                continue
+            residue = line[21:27]
+            if residue not in seen:
+                if len(seen) == residues:
+                    break
+                seen.append(residue)
+            kept.append(line)
+    Path(output_path).write_text("".join(kept) + "END\n")
+    return Path(output_path)
+
+
+def directory_volume(path):
+    """Bytes and files written below a directory"""
+    files = [p for p in Path(path).rglob("*") if p.is_file()]
+    return sum(p.stat().st_size for p in files), len(files)
+
+
+def run_job(pdb_path, output_dir):
+    """Run one orchestrated job; executed in a worker process"""
+    from run_binder_generation import run_binder_generation
+
+    # Silence the pipeline and the stand-in (which inherits file descriptor 1)
+    sys.stdout.flush()
+    saved_stdout = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        ok = run_binder_generation(
+            pdb_path=pdb_path,
+            design_samples=DESIGN_SAMPLES,
+            output_dir=output_dir,
+            additional_args=[
+                "--length_min", str(LENGTH_RANGE[0]),
+                "--length_max", str(LENGTH_RANGE[1]),
+            ],
+        )
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved_stdout, 1)
+        os.close(saved_stdout)
+        os.close(devnull)
+    if not ok:
+        raise RuntimeError(f"Benchmark job failed: {output_dir}")
+    return output_dir
+
+
+def measure_startup(repeats=3):
+    """Best-of-N time to start Python and import the orchestration module"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "import run_binder_generation"],
+            cwd=REPO_DIR, check=True
+        )
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure_throughput(pdb_path, work_dir, workers):
+    """Designs per second for JOBS jobs spread over `workers` processes"""
+    output_dirs = [Path(work_dir) / f"w{workers}_job{i}" for i in range(JOBS)]
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run_job, [pdb_path] * JOBS, output_dirs))
+    elapsed = time.perf_counter() - start
+    return JOBS * DESIGN_SAMPLES / elapsed
+
+
+def run_suite(workers):
+    """Run all benchmarks and return a flat dict of metrics"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="boltz_bench_") as work_dir:
+        work_dir = Path(work_dir)
+        os.environ["BOLTZDESIGN_SCRIPT"] = str(STANDIN_SCRIPT)
+        os.environ[run_telemetry.TELEMETRY_FILE_ENV] = str(work_dir / "telemetry.jsonl")
+        pdb_path = make_target_crop(SOURCE_PDB, work_dir / "bench_target.pdb")
+
+        results["startup_seconds"] = measure_startup()
+
+        # Single job for per-stage latency, memory and I/O
+        single_dir = work_dir / "single"
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            pool.submit(run_job, pdb_path, single_dir).result()
+        results["job_seconds"] = time.perf_counter() - start
+        record = run_telemetry.read_records()[-1]
+        for stage, seconds in record["stage_seconds"].items():
+            results[f"stage_{stage}_seconds"] = seconds
+        if record["peak_rss_bytes"] is not None:
+            results["peak_rss_mb"] = record["peak_rss_bytes"] / 1024 ** 2
+        written_bytes, written_files = directory_volume(single_dir)
+        results["io_written_kb"] = written_bytes / 1024
+        results["io_written_files"] = written_files
+        results["successful_designs"] = record["successful_designs"]
+
+        results["throughput_1_worker"] = measure_throughput(pdb_path, work_dir, 1)
+        results["throughput_n_workers"] = measure_throughput(pdb_path, work_dir, workers)
+        results["n_workers"] = workers
+        results["cpu_count"] = os.cpu_count() or 1
+        results["scaling_efficiency"] = results["throughput_n_workers"] / (results["throughput_1_worker"] * workers)
+    return results
+
+
+def compare(results, baselines, tolerance):
+    """
+    Compare results with baselines
+
+    Returns:
+        List of (metric, value, baseline, status) tuples
+    """
+    report = []
+    for metric, baseline in sorted(baselines.items()):
+        if metric not in results or not isinstance(baseline, (int, float)) or baseline == 0:
+            continue
+        value = results[metric]
+        if metric in INFORMATIONAL:
+            status = "info"
+        elif metric in WORKER_DEPENDENT and results.get("n_workers") != baselines.get("n_workers"):
+            status = "skipped (n_workers differs)"
+        elif metric == "successful_designs":
+            # The stand-in model is deterministic, so yield must match exactly
+            status = "ok" if value == baseline else "REGRESSION"
+        elif metric in HIGHER_IS_BETTER:
+            status = "REGRESSION" if value < baseline * (1 - tolerance) else "ok"
+        else:
+            slack = TIMING_SLACK_SECONDS if metric.endswith("_seconds") else 0.0
+            status = "REGRESSION" if value > baseline * (1 + tolerance) + slack else "ok"
+        report.append((metric, value, baseline, status))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="CPU benchmark suite for binder generation orchestration",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:")[1]
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Worker count for the N-worker throughput run (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed relative regression against baselines (default: 0.5)")
+    parser.add_argument("--baselines", type=str, default=str(BASELINES_FILE),
+                        help="Baseline file (default: benchmarks/baselines.json)")
+    parser.add_argument("--update-baselines", action="store_true",
+                        help="Store this run as the new baseline")
+    parser.add_argument("--json", type=str, default=None, help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"⏱  Running benchmarks ({CROP_RESIDUES}-residue target, {args.workers} workers)...")
+    results = run_suite(args.workers)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+
+    baselines_file = Path(args.baselines)
+    if args.update_baselines or not baselines_file.exists():
+        baselines_file.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"📝 Baselines written to {baselines_file}")
+        for metric, value in sorted(results.items()):
+            print(f"   {metric:<28} {value:12.4f}")
+        return 0
+
+    baselines = json.loads(baselines_file.read_text())
+    report = compare(results, baselines, args.tolerance)
+    print(f"\n   {'METRIC':<28} {'VALUE':>12} {'BASELINE':>12}  STATUS")
+    for metric, value, baseline, status in report:
+        print(f"   {metric:<28} {value:12.4f} {baseline:12.4f}  {status}")
+
+    regressions = [r for r in report if r[3] == "REGRESSION"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance")
+        return 1
+    print(f"\n✅ All metrics within {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
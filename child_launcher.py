@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Exec shim for pipeline subprocesses
+Ties a child to the lifetime of the process that started it (Linux
+PR_SET_PDEATHSIG) and optionally pins it to a set of cores from a fresh
+single-threaded interpreter, then execs the real command. This replaces a
+subprocess preexec_fn, which is unsafe in the multi-threaded workers that
+start pipeline runs.
+
+Usage:
+  python -S child_launcher.py --parent PID [--cpus 0-3,8] -- COMMAND [ARGS...]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import signal
+import sys
+from pathlib import Path
+
+from cpu_affinity import format_cpulist, parse_cpulist
+
+
+LAUNCHER = Path(__file__).resolve()
+
+PR_SET_PDEATHSIG = 1
+
+
+def launch_command(cmd, cpus=None):
+    """
+    Prefix a command so it is killed when this process dies
+
+    The signal fires when the thread that started the child exits, so start
+    children from a thread that waits for them. Outside Linux the command is
+    returned unchanged.
+
+    Args:
+        cmd: Command list
+        cpus: CPU IDs to pin the command to before it starts (optional)
+    """
+    if not sys.platform.startswith("linux"):
+        return list(cmd)
+    # -S: the launcher must not run the pipeline's sitecustomize hook
+    launcher = [sys.executable, "-S", str(LAUNCHER), "--parent", str(os.getpid())]
+    if cpus:
+        launcher += ["--cpus", format_cpulist(cpus)]
+    return launcher + ["--"] + list(cmd)
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a command that dies with its parent")
+    parser.add_argument("--parent", type=int, required=True, help="PID the command must not outlive")
+    parser.add_argument("--cpus", type=str, default=None, help="CPU list to pin the command to, e.g. 0-3,8")
+    parser.add_argument("command", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    if not command:
+        parser.error("no command given")
+
+    if args.cpus:
+        # Inherited by every thread and process the command starts
+        os.sched_setaffinity(0, parse_cpulist(args.cpus))
+
+    libc = _load_libc()
+    if libc is not None and libc.prctl(PR_SET_PDEATHSIG, signal.SIGKILL) != 0:
+        print(f"⚠️  PR_SET_PDEATHSIG failed: {os.strerror(ctypes.get_errno())}", file=sys.stderr)
+    # The parent may have died before the signal was armed
+    if os.getppid() != args.parent:
+        return 1
+
+    try:
+        os.execvp(command[0], command)
+    except OSError as e:
+        print(f"❌ Cannot run {command[0]}: {e}", file=sys.stderr)
+        return 127
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+NUMA- and core-aware CPU execution for BoltzDesign1 binder generation
+Detects sockets, NUMA nodes and physical cores, partitions them among
+concurrent CPU workers, and pins each worker's pipeline to its cores, its
+local memory node and a matching number of intra-/inter-op threads
+"""
+
+import os
+import platform
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+SYS_NODE_DIR = Path("/sys/devices/system/node")
+SYS_CPU_DIR = Path("/sys/devices/system/cpu")
+
+INTRAOP_THREADS_ENV = "BOLTZ_INTRAOP_THREADS"
+INTEROP_THREADS_ENV = "BOLTZ_INTEROP_THREADS"
+
+# Thread-pool variables read by OpenMP, MKL, OpenBLAS and numexpr at start-up
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+@dataclass
+class CpuSlot:
+    """Cores and memory node assigned to one CPU worker"""
+    index: int
+    node: int
+    cpus: list = field(default_factory=list)
+
+    @property
+    def threads(self):
+        return len(self.cpus)
+
+
+def parse_cpulist(text):
+    """Parse a Linux cpulist such as '0-3,8-11' into a list of CPU ids"""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def format_cpulist(cpus):
+    """Format CPU ids as a compact cpulist for numactl/taskset"""
+    cpus = sorted(cpus)
+    ranges = []
+    start = prev = None
+    for cpu in cpus:
+        if start is None:
+            start = prev = cpu
+        elif cpu == prev + 1:
+            prev = cpu
+        else:
+            ranges.append(f"{start}-{prev}" if prev != start else str(start))
+            start = prev = cpu
+    if start is not None:
+        ranges.append(f"{start}-{prev}" if prev != start else str(start))
+    return ",".join(ranges)
+
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _read(path):
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def detect_topology(physical_cores_only=True):
+    """
+    Detect NUMA nodes and the usable cores on each
+
+    Args:
+        physical_cores_only: Keep one hardware thread per physical core, so
+                             workers do not share cores through SMT siblings
+
+    Returns:
+        Dict mapping NUMA node id to a sorted list of CPU ids. Falls back to a
+        single node 0 holding all allowed CPUs when sysfs is unavailable.
+    """
+    allowed = set(available_cpus())
+    nodes = {}
+    if SYS_NODE_DIR.exists():
+        for node_dir in sorted(SYS_NODE_DIR.glob("node[0-9]*")):
+            cpulist = _read(node_dir / "cpulist")
+            if cpulist:
+                cpus = [cpu for cpu in parse_cpulist(cpulist) if cpu in allowed]
+                if cpus:
+                    nodes[int(node_dir.name[4:])] = cpus
+    if not nodes:
+        nodes = {0: sorted(allowed)}
+
+    if physical_cores_only:
+        for node, cpus in nodes.items():
+            seen_cores = set()
+            primary = []
+            for cpu in cpus:
+                topology = SYS_CPU_DIR / f"cpu{cpu}" / "topology"
+                core = (_read(topology / "physical_package_id"), _read(topology / "core_id"))
+                if core == (None, None) or core not in seen_cores:
+                    seen_cores.add(core)
+                    primary.append(cpu)
+            nodes[node] = primary
+    return nodes
+
+
+def count_sockets():
+    """Number of CPU packages (sockets) visible to this process"""
+    packages = {
+        _read(SYS_CPU_DIR / f"cpu{cpu}" / "topology" / "physical_package_id")
+        for cpu in available_cpus()
+    }
+    packages.discard(None)
+    return max(len(packages), 1)
+
+
+def partition_cpus(workers, topology=None):
+    """
+    Split cores among workers without letting a worker span NUMA nodes
+
+    Nodes receive workers in proportion to their core counts; within a node
+    each worker gets a contiguous block of cores.
+
+    Args:
+        workers: Number of concurrent CPU workers
+        topology: Output of detect_topology() (detected if omitted)
+
+    Returns:
+        List of CpuSlot, one per worker
+    """
+    topology = topology or detect_topology()
+    total = sum(len(cpus) for cpus in topology.values())
+    workers = max(1, min(workers, total))
+
+    # Hand out workers one at a time to the node that keeps the most cores per
+    # worker; on ties, split the node whose workers currently have the most
+    nodes = sorted(topology)
+    shares = {node: 0 for node in nodes}
+
+    def priority(node):
+        cores = len(topology[node])
+        current = cores / shares[node] if shares[node] else float("inf")
+        return (cores / (shares[node] + 1), current, -node)
+
+    for _ in range(workers):
+        shares[max(nodes, key=priority)] += 1
+
+    slots = []
+    for node in nodes:
+        cpus = topology[node]
+        count = shares[node]
+        if count == 0:
+            continue
+        size, extra = divmod(len(cpus), count)
+        start = 0
+        for i in range(count):
+            end = start + size + (1 if i < extra else 0)
+            slots.append(CpuSlot(index=len(slots), node=node, cpus=cpus[start:end]))
+            start = end
+    return slots
+
+
+def cpu_worker_env(env, slot, interop_threads=1):
+    """
+    Configure a subprocess environment for one CPU worker
+
+    Hides GPUs and sizes every thread pool to the worker's core count so
+    concurrent workers do not oversubscribe the machine.
+    """
+    env["CUDA_VISIBLE_DEVICES"] = ""
+    for var in THREAD_ENV_VARS:
+        env[var] = str(slot.threads)
+    env[INTRAOP_THREADS_ENV] = str(slot.threads)
+    env[INTEROP_THREADS_ENV] = str(interop_threads)
+    # Keep OpenMP threads on the cores they were started on
+    env.setdefault("OMP_PROC_BIND", "close")
+    env.setdefault("OMP_PLACES", "cores")
+    return env
+
+
+def pinned_command(cmd, slot):
+    """
+    Prefix a command so it runs on the slot's cores and allocates from its node
+
+    Uses numactl when installed (CPU and memory binding). Otherwise the
+    command is returned unchanged and affinity_cpus() gives the cores for
+    child_launcher to pin it to; memory then follows the first-touch policy,
+    which keeps allocations local to the pinned cores.
+    """
+    if shutil.which("numactl"):
+        return [
+            "numactl",
+            f"--physcpubind={format_cpulist(slot.cpus)}",
+            f"--membind={slot.node}",
+        ] + list(cmd)
+    return list(cmd)
+
+
+def affinity_cpus(slot):
+    """Cores child_launcher should pin the child to, or None when numactl does the pinning"""
+    if shutil.which("numactl") or not hasattr(os, "sched_setaffinity"):
+        return None
+    return slot.cpus
+
+
+def apply_thread_settings_from_env():
+    """Size PyTorch's thread pools from the environment set by cpu_worker_env()"""
+    intraop = os.environ.get(INTRAOP_THREADS_ENV)
+    interop = os.environ.get(INTEROP_THREADS_ENV)
+    if not intraop and not interop:
+        return
+    import torch
+
+    if intraop:
+        torch.set_num_threads(int(intraop))
+    if interop:
+        try:
+            torch.set_num_interop_threads(int(interop))
+        except RuntimeError:
+            # Already fixed once inter-op work has started
+            pass
+
+
+def describe_slots(slots):
+    """Print the core assignment of each worker"""
+    print(f"🧩 CPU mode: {count_sockets()} socket(s), {len({s.node for s in slots})} NUMA node(s) in use, "
+          f"{sum(s.threads for s in slots)} core(s) on {platform.machine()}")
+    for slot in slots:
+        print(f"   Worker {slot.index}: node {slot.node}, cores {format_cpulist(slot.cpus)} "
+              f"({slot.threads} intra-op threads)")
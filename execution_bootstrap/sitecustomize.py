@@ -0,0 +1,50 @@
+"""
+Start-up hook for BoltzDesign1 pipeline subprocesses
+run_binder_generation.py puts this directory on PYTHONPATH so that every
+Python process of the pipeline applies the selected execution mode
+"""
+
+import importlib.machinery
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+HOOK_DIR = Path(__file__).parent.resolve()
+
+# Variables of an explicitly requested mode (execution_modes.PRECISION_ENV,
+# COMPILE_ENV and SEED_ENV); a process must not run without it
+REQUIRED_MODE_ENV = ("BOLTZ_PRECISION", "BOLTZ_COMPILE", "BOLTZ_SEED")
+
+
+def _run_shadowed_sitecustomize():
+    """Run the sitecustomize this hook hides on sys.path (e.g. the distribution's)"""
+    search_path = [p for p in sys.path if Path(p or ".").resolve() != HOOK_DIR]
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", search_path)
+    if spec is None or spec.loader is None:
+        return
+    try:
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    except Exception as e:
+        # Same treatment site.py gives a failing sitecustomize
+        print(f"Error in sitecustomize {spec.origin}: {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def _mode_requested():
+    return any(os.environ.get(var) not in (None, "", "0") for var in REQUIRED_MODE_ENV)
+
+
+_run_shadowed_sitecustomize()
+
+sys.path.append(str(HOOK_DIR.parent))
+
+try:
+    import execution_modes
+    execution_modes.apply_from_env()
+except Exception as e:
+    if _mode_requested():
+        # Running anyway would record results under a mode that was never applied
+        print(f"❌ Execution mode requested but not applied: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.stderr.flush()
+        os._exit(1)
+    print(f"⚠️  Execution mode not applied: {e}", file=sys.stderr)
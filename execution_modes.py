@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Execution modes for BoltzDesign1 binder generation
+Selects numeric precision (fp32, bf16, tf32) and graph compilation, applied
+consistently to every Python process the pipeline starts (design, Boltz
+prediction and validation) through the sitecustomize hook in
+execution_bootstrap/
+"""
+
+import json
+import os
+import random
+import sys
+from pathlib import Path
+
+from cpu_affinity import apply_thread_settings_from_env
+
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+BOOTSTRAP_DIR = SCRIPT_DIR / "execution_bootstrap"
+DEFAULT_COMPILE_CACHE = Path.home() / ".boltz" / "compile_cache"
+
+PRECISIONS = ("fp32", "bf16", "tf32")
+PRECISION_ENV = "BOLTZ_PRECISION"
+COMPILE_ENV = "BOLTZ_COMPILE"
+SEED_ENV = "BOLTZ_SEED"
+
+# Boltz1 hyperparameters that wrap its trunk modules in torch.compile
+COMPILE_HPARAMS = ("compile_pairformer", "compile_structure", "compile_confidence")
+
+# Largest mean ipTM / pLDDT drop accepted against the fp32 reference
+ACCURACY_TOLERANCE = {"iptm": 0.02, "plddt": 1.0}
+# Complexes re-predicted by the accuracy check, and the seed both modes use
+ACCURACY_COMPLEXES = 8
+ACCURACY_SEED = 0
+
+
+def bootstrap_env(env):
+    """
+    Put the sitecustomize start-up hook on a subprocess environment's PYTHONPATH
+
+    The hook runs the sitecustomize it shadows (e.g. the distribution's)
+    before applying the mode, and a mode that fails to apply is fatal.
+    """
+    paths = [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    if str(BOOTSTRAP_DIR) not in paths:
+        env["PYTHONPATH"] = os.pathsep.join([str(BOOTSTRAP_DIR)] + paths)
+    return env
+
+
+def execution_env(env, precision="fp32", compile=False, compile_cache=None, seed=None):
+    """
+    Add the settings for an execution mode to a subprocess environment
+
+    Args:
+        env: Environment dict to update (e.g. a copy of os.environ)
+        precision: One of PRECISIONS
+        compile: Whether to compile the model with torch.compile
+        compile_cache: Persistent compile cache directory (default: ~/.boltz/compile_cache)
+        seed: Seed for the Python, NumPy and torch generators (default: unseeded)
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    env[PRECISION_ENV] = precision
+    env[COMPILE_ENV] = "1" if compile else "0"
+    if seed is not None:
+        env[SEED_ENV] = str(seed)
+    bootstrap_env(env)
+    if compile:
+        cache = Path(compile_cache or DEFAULT_COMPILE_CACHE)
+        cache.mkdir(parents=True, exist_ok=True)
+        env.setdefault("TORCHINDUCTOR_CACHE_DIR", str(cache))
+        env.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+        env.setdefault("TORCHINDUCTOR_AUTOGRAD_CACHE", "1")
+    return env
+
+
+def configure_float32(precision):
+    """Select IEEE fp32 or TF32 for float32 matmuls and convolutions"""
+    import torch
+
+    mode = "tf32" if precision == "tf32" else "ieee"
+    if hasattr(torch.backends.cuda.matmul, "fp32_precision"):
+        # PyTorch >= 2.9; the allow_tf32 flags are deprecated there
+        torch.backends.cuda.matmul.fp32_precision = mode
+        torch.backends.cudnn.conv.fp32_precision = mode
+    else:
+        torch.backends.cuda.matmul.allow_tf32 = mode == "tf32"
+        torch.backends.cudnn.allow_tf32 = mode == "tf32"
+
+
+def autocast_device():
+    """Device type autocast should target in this process"""
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def apply_from_env():
+    """
+    Apply the execution mode selected by run_binder_generation.py
+
+    Called from execution_bootstrap/sitecustomize.py at interpreter start-up
+    of every pipeline subprocess.
+    """
+    apply_thread_settings_from_env()
+
+    seed = os.environ.get(SEED_ENV)
+    if seed:
+        seed_generators(int(seed))
+
+    precision = os.environ.get(PRECISION_ENV)
+    if not precision:
+        return
+    import torch
+
+    configure_float32(precision)
+
+    # Keep Boltz from switching the float32 mode back behind our back
+    pinned = "high" if precision == "tf32" else "highest"
+    set_precision = torch.set_float32_matmul_precision
+    torch.set_float32_matmul_precision = lambda _mode: set_precision(pinned)
+
+    if precision == "bf16":
+        # Autocast state is per thread; model inference runs on the main thread
+        torch.autocast(device_type=autocast_device(), dtype=torch.bfloat16).__enter__()
+
+    if os.environ.get(COMPILE_ENV) == "1":
+        _install_compile_hook()
+
+
+def seed_generators(seed):
+    """Seed the Python, NumPy and torch random generators of this process"""
+    random.seed(seed)
+    try:
+        import numpy
+        numpy.random.seed(seed)
+    except ImportError:
+        pass
+    try:
+        import torch
+        torch.manual_seed(seed)
+    except ImportError:
+        pass
+
+
+def _install_compile_hook():
+    """Turn on Boltz1's torch.compile flags whenever a checkpoint is loaded"""
+    import importlib.abc
+    import importlib.util
+
+    def patch(module):
+        model_cls = getattr(module, "Boltz1", None)
+        if model_cls is None:
+            return
+        load = getattr(model_cls.load_from_checkpoint, "__func__", None)
+        if load is None:
+            return
+
+        def load_compiled(cls, *args, **kwargs):
+            for hparam in COMPILE_HPARAMS:
+                kwargs.setdefault(hparam, True)
+            return load(cls, *args, **kwargs)
+
+        model_cls.load_from_checkpoint = classmethod(load_compiled)
+
+    class CompileFinder(importlib.abc.MetaPathFinder):
+        def find_spec(self, name, path, target=None):
+            if name != "boltz.model.model":
+                return None
+            sys.meta_path.remove(self)
+            try:
+                spec = importlib.util.find_spec(name)
+            finally:
+                sys.meta_path.insert(0, self)
+            if spec is None or spec.loader is None:
+                return None
+            exec_module = spec.loader.exec_module
+
+            def exec_and_patch(module):
+                exec_module(module)
+                patch(module)
+
+            spec.loader.exec_module = exec_and_patch
+            return spec
+
+    sys.meta_path.insert(0, CompileFinder())
+
+
+def boltz_input_yaml(sequences):
+    """
+    Boltz input for a complex, single-sequence so both modes see the same input
+
+    Args:
+        sequences: Dict mapping chain ID to protein sequence
+    """
+    lines = ["version: 1", "sequences:"]
+    for chain, sequence in sequences.items():
+        lines += ["  - protein:", f"      id: {chain}", f"      sequence: {sequence}", "      msa: empty"]
+    return "\n".join(lines) + "\n"
+
+
+def collect_prediction_scores(out_dir):
+    """
+    Collect ipTM/pLDDT of the top-ranked model of every complex Boltz predicted
+
+    Args:
+        out_dir: --out_dir of a `boltz predict` run
+
+    Returns:
+        Dict mapping complex name to {"iptm": ..., "plddt": ...}, pLDDT on the
+        0-100 scale
+    """
+    scores = {}
+    for path in sorted(Path(out_dir).glob("**/predictions/*/confidence_*_model_0.json")):
+        confidence = json.loads(path.read_text())
+        plddt = confidence.get("complex_plddt")
+        scores[path.parent.name] = {
+            "iptm": confidence.get("iptm"),
+            "plddt": plddt * 100 if plddt is not None and plddt <= 1.0 else plddt,
+        }
+    return scores
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def compare_accuracy(reference_scores, candidate_scores, tolerance=None):
+    """
+    Compare per-complex ipTM/pLDDT of a re-prediction with the fp32 reference
+
+    Only complexes predicted in both modes are paired; a complex missing from
+    the candidate fails the check.
+
+    Returns:
+        Tuple (passed, rows) where rows are (metric, reference mean,
+        candidate mean, mean paired delta)
+    """
+    tolerance = tolerance or ACCURACY_TOLERANCE
+    names = sorted(set(reference_scores) & set(candidate_scores))
+    passed = bool(names) and set(reference_scores) <= set(candidate_scores)
+    rows = []
+    for metric, limit in tolerance.items():
+        pairs = [
+            (reference_scores[name][metric], candidate_scores[name][metric]) for name in names
+            if reference_scores[name][metric] is not None and candidate_scores[name][metric] is not None
+        ]
+        if not pairs:
+            rows.append((metric, None, None, None))
+            passed = False
+            continue
+        delta = _mean([candidate - reference for reference, candidate in pairs])
+        rows.append((metric, _mean([r for r, _ in pairs]), _mean([c for _, c in pairs]), delta))
+        if delta < -limit:
+            passed = False
+    return passed, rows
+
+
+def print_accuracy_report(precision, compile, passed, rows):
+    mode = f"{precision}{' + compile' if compile else ''}"
+    print(f"\n{'='*60}")
+    print(f"🎯 Accuracy check: {mode} vs fp32")
+    print(f"{'='*60}")
+    for metric, reference, candidate, delta in rows:
+        if delta is None:
+            print(f"   {metric:<6} no paired scores found")
+        else:
+            limit = ACCURACY_TOLERANCE[metric]
+            status = "✅" if delta >= -limit else "❌"
+            print(f"   {status} {metric:<6} fp32={reference:.4f}  {mode}={candidate:.4f}  "
+                  f"delta={delta:+.4f} (limit -{limit})")
+    print(f"\n   {'✅ PASS' if passed else '❌ FAIL'}")
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Local job queue for BoltzDesign1 binder generation
+SQLite-backed queue with priorities; workers lease jobs per device slot and
+run run_binder_generation.py as the job payload
+
+Usage:
+  python job_queue.py submit --priority 10 -- --design_samples 4 --length_min 80
+  python job_queue.py list
+  python job_queue.py cancel 3
+  python job_queue.py priority 3 20
+  python job_queue.py worker --devices 0,1
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import run_telemetry
+from child_launcher import launch_command
+from cpu_affinity import (
+    affinity_cpus,
+    cpu_worker_env,
+    describe_slots,
+    partition_cpus,
+    pinned_command,
+)
+from execution_modes import bootstrap_env
+from metrics_exporter import (
+    MetricsRegistry,
+    queue_depth_collector,
+    start_metrics_server,
+    worker_rss_collector,
+)
+
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEFAULT_DB = SCRIPT_DIR / "logs" / "jobs.sqlite"
+LOG_DIR = SCRIPT_DIR / "logs"
+
+LEASE_SECONDS = 120
+HEARTBEAT_SECONDS = 15
+MAX_ATTEMPTS = 3
+# Seconds a stopped job gets to exit after SIGTERM before it is killed
+STOP_GRACE_SECONDS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    state         TEXT    NOT NULL DEFAULT 'queued',
+    args          TEXT    NOT NULL,
+    submitted_at  REAL    NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    worker        TEXT,
+    device        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    returncode    INTEGER,
+    log_path      TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_state ON jobs (state, priority DESC, id);
+CREATE TABLE IF NOT EXISTS workers (
+    id           TEXT PRIMARY KEY,
+    host         TEXT NOT NULL,
+    pid          INTEGER NOT NULL,
+    devices      TEXT NOT NULL,
+    started_at   REAL NOT NULL,
+    heartbeat_at REAL NOT NULL
+);
+"""
+
+# queued -> running -> succeeded | failed
+# queued -> cancelled;  running -> cancelling -> cancelled
+ACTIVE_STATES = ("queued", "running", "cancelling")
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open the queue database, creating it if needed"""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def submit(conn, args, priority=0):
+    """Add a job; `args` are command-line arguments for run_binder_generation.py"""
+    cur = conn.execute(
+        "INSERT INTO jobs (priority, args, submitted_at) VALUES (?, ?, ?)",
+        (priority, json.dumps(list(args)), time.time())
+    )
+    return cur.lastrowid
+
+
+def list_jobs(conn, include_finished=True):
+    """Return jobs ordered by state, priority and submission order"""
+    query = "SELECT * FROM jobs"
+    if not include_finished:
+        query += f" WHERE state IN {ACTIVE_STATES}"
+    query += " ORDER BY CASE state WHEN 'running' THEN 0 WHEN 'queued' THEN 1 ELSE 2 END, priority DESC, id"
+    return conn.execute(query).fetchall()
+
+
+def queue_depth(conn):
+    """Number of jobs waiting for a device slot"""
+    return conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued'").fetchone()[0]
+
+
+def cancel(conn, job_id):
+    """Cancel a queued job, or ask the owning worker to stop a running one"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["state"] == "queued":
+            conn.execute(
+                "UPDATE jobs SET state = 'cancelled', finished_at = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+        elif row["state"] == "running":
+            conn.execute("UPDATE jobs SET state = 'cancelling' WHERE id = ?", (job_id,))
+        return conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()["state"]
+    finally:
+        conn.execute("COMMIT")
+
+
+def set_priority(conn, job_id, priority):
+    """Change the priority of a queued job"""
+    cur = conn.execute(
+        "UPDATE jobs SET priority = ? WHERE id = ? AND state = 'queued'",
+        (priority, job_id)
+    )
+    return cur.rowcount == 1
+
+
+def requeue_expired(conn, now=None):
+    """
+    Return jobs whose lease has expired (their worker crashed) to the queue
+
+    Jobs that already used MAX_ATTEMPTS are marked failed instead.
+    """
+    now = now or time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        expired = conn.execute(
+            "SELECT id, attempts, state FROM jobs "
+            "WHERE state IN ('running', 'cancelling') AND lease_expires < ?",
+            (now,)
+        ).fetchall()
+        for row in expired:
+            if row["state"] == "cancelling":
+                new_state = "cancelled"
+            elif row["attempts"] >= MAX_ATTEMPTS:
+                new_state = "failed"
+            else:
+                new_state = "queued"
+            conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, device = NULL, lease_expires = NULL, "
+                "finished_at = CASE WHEN ? = 'queued' THEN NULL ELSE ? END WHERE id = ?",
+                (new_state, new_state, now, row["id"])
+            )
+        conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (now - LEASE_SECONDS,))
+        return [row["id"] for row in expired]
+    finally:
+        conn.execute("COMMIT")
+
+
+def lease(conn, worker_id, device):
+    """Atomically claim the highest-priority queued job, or return None"""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE state = 'queued' ORDER BY priority DESC, id LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        log_path = LOG_DIR / f"job_{row['id']}_attempt{row['attempts'] + 1}.log"
+        conn.execute(
+            "UPDATE jobs SET state = 'running', worker = ?, device = ?, started_at = ?, "
+            "lease_expires = ?, attempts = attempts + 1, log_path = ? WHERE id = ?",
+            (worker_id, device, now, now + LEASE_SECONDS, str(log_path), row["id"])
+        )
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+    finally:
+        conn.execute("COMMIT")
+
+
+def heartbeat(conn, job_id, worker_id):
+    """Extend the lease on a running job; returns its current state"""
+    conn.execute(
+        "UPDATE jobs SET lease_expires = ? WHERE id = ? AND worker = ?",
+        (time.time() + LEASE_SECONDS, job_id, worker_id)
+    )
+    row = conn.execute("SELECT state, worker FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None or row["worker"] != worker_id:
+        return "lost"
+    return row["state"]
+
+
+def finish(conn, job_id, worker_id, returncode):
+    """Record the outcome of a job the worker still owns"""
+    conn.execute(
+        "UPDATE jobs SET state = CASE WHEN state = 'cancelling' THEN 'cancelled' "
+        "WHEN ? = 0 THEN 'succeeded' ELSE 'failed' END, "
+        "finished_at = ?, returncode = ?, lease_expires = NULL WHERE id = ? AND worker = ?",
+        (returncode, time.time(), returncode, job_id, worker_id)
+    )
+
+
+def release(conn, job_id, worker_id):
+    """Return a running job to the queue when its worker shuts down"""
+    conn.execute(
+        "UPDATE jobs SET state = CASE WHEN state = 'cancelling' THEN 'cancelled' ELSE 'queued' END, "
+        "worker = NULL, device = NULL, lease_expires = NULL WHERE id = ? AND worker = ?",
+        (job_id, worker_id)
+    )
+
+
+def job_command(job):
+    """Build the run_binder_generation.py command for a leased job"""
+    args = json.loads(job["args"])
+    # The device is selected through CUDA_VISIBLE_DEVICES, so the job always sees GPU 0
+    if "--gpu_id" not in args:
+        args.extend(["--gpu_id", "0"])
+    return [sys.executable, str(SCRIPT_DIR / "run_binder_generation.py")] + args
+
+
+def job_env(job, device, cpu_slot=None):
+    """Environment for a job running on one device slot"""
+    env = os.environ.copy()
+    env[run_telemetry.JOB_ID_ENV] = str(job["id"])
+    env["CUDA_VISIBLE_DEVICES"] = "" if device == "cpu" else str(device)
+    if cpu_slot is not None:
+        cpu_worker_env(env, cpu_slot)
+        bootstrap_env(env)
+    env.setdefault("PYTORCH_CUDA_ALLOC_CONF", "max_split_size_mb:512")
+    return env
+
+
+def stop_process_group(process, grace_seconds=STOP_GRACE_SECONDS):
+    """SIGTERM a child started with start_new_session=True and everything it started, then SIGKILL"""
+    if not hasattr(os, "killpg"):
+        # Windows has no process groups to signal; stop the child itself
+        process.terminate()
+        try:
+            process.wait(timeout=grace_seconds)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    try:
+        process.wait(timeout=grace_seconds)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+
+
+class Worker:
+    """
+    Run queued jobs, one per device slot, until stopped
+
+    Args:
+        db_path: Path to the queue database
+        devices: Device slots, e.g. ["0", "1"] or ["cpu", "cpu"]
+        poll_seconds: How often idle slots check for new jobs
+        once: Exit when the queue is empty instead of waiting for new jobs
+        metrics_port: Serve Prometheus metrics on this localhost port (0 disables)
+        cpu_slots: cpu_affinity.CpuSlot per device slot; pins each "cpu" slot
+                   to its own cores and NUMA node (optional)
+    """
+
+    def __init__(self, db_path, devices, poll_seconds=5, once=False, metrics_port=0, cpu_slots=None):
+        self.db_path = db_path
+        self.devices = devices
+        self.cpu_slots = cpu_slots or []
+        self.poll_seconds = poll_seconds
+        self.once = once
+        self.metrics_port = metrics_port
+        self.metrics = MetricsRegistry()
+        self.running = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stop_event = threading.Event()
+
+    def register(self, conn):
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO workers (id, host, pid, devices, started_at, heartbeat_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (self.worker_id, socket.gethostname(), os.getpid(), ",".join(self.devices), now, now)
+        )
+
+    def run_slot(self, device, index):
+        conn = connect(self.db_path)
+        while not self.stop_event.is_set():
+            conn.execute(
+                "UPDATE workers SET heartbeat_at = ? WHERE id = ?", (time.time(), self.worker_id)
+            )
+            requeued = requeue_expired(conn)
+            if requeued:
+                print(f"♻️  Requeued jobs from crashed workers: {requeued}")
+            job = lease(conn, self.worker_id, device)
+            if job is None:
+                if self.once:
+                    break
+                self.stop_event.wait(self.poll_seconds)
+                continue
+            self.run_job(conn, job, device, index)
+        conn.close()
+
+    def run_job(self, conn, job, device, index):
+        cmd = job_command(job)
+        cpu_slot = self.cpu_slots[index] if index < len(self.cpu_slots) else None
+        pin_cpus = None
+        if cpu_slot is not None:
+            cmd = pinned_command(cmd, cpu_slot)
+            pin_cpus = affinity_cpus(cpu_slot)
+        log_path = Path(job["log_path"])
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"🚀 Job {job['id']} on device {device}: {' '.join(cmd)}")
+        with open(log_path, "w") as log:
+            # Own session: Ctrl+C on the worker does not reach the job directly,
+            # and the whole job can be stopped as one process group
+            # and it is killed with the worker (child_launcher) if the worker dies
+            process = subprocess.Popen(
+                launch_command(cmd, cpus=pin_cpus), cwd=SCRIPT_DIR, env=job_env(job, device, cpu_slot),
+                stdout=log, stderr=subprocess.STDOUT, start_new_session=True
+            )
+            self.running[f"{device}:{job['id']}"] = process.pid
+            next_heartbeat = time.time() + HEARTBEAT_SECONDS
+            while process.poll() is None:
+                # Wake up every second so a stopping worker does not wait for the next heartbeat
+                try:
+                    process.wait(timeout=1)
+                except subprocess.TimeoutExpired:
+                    pass
+                state = None
+                if time.time() >= next_heartbeat:
+                    state = heartbeat(conn, job["id"], self.worker_id)
+                    next_heartbeat = time.time() + HEARTBEAT_SECONDS
+                if state in ("cancelling", "lost") or self.stop_event.is_set():
+                    stop_process_group(process)
+                    break
+        self.running.pop(f"{device}:{job['id']}", None)
+        self.record_metrics(job)
+        if self.stop_event.is_set():
+            release(conn, job["id"], self.worker_id)
+            print(f"♻️  Job {job['id']} returned to the queue")
+            return
+        finish(conn, job["id"], self.worker_id, process.returncode)
+        print(f"{'✅' if process.returncode == 0 else '❌'} Job {job['id']} exited with {process.returncode}")
+
+    def record_metrics(self, job):
+        """Feed the telemetry record written by a finished job into the metrics"""
+        for record in reversed(run_telemetry.read_records()):
+            if record.get("job_id") == str(job["id"]) and record.get("started_at", 0) >= job["started_at"]:
+                self.metrics.record_run(record)
+                return
+
+    def run(self):
+        conn = connect(self.db_path)
+        self.register(conn)
+        if self.metrics_port:
+            self.metrics.add_collector(queue_depth_collector(self.db_path))
+            self.metrics.add_collector(worker_rss_collector(lambda: dict(self.running)))
+            start_metrics_server(self.metrics, port=self.metrics_port)
+        print(f"👷 Worker {self.worker_id} serving devices: {', '.join(self.devices)}")
+        threads = [
+            threading.Thread(target=self.run_slot, args=(device, index), daemon=True)
+            for index, device in enumerate(self.devices)
+        ]
+        for thread in threads:
+            thread.start()
+        # Stop on SIGTERM (systemd, kill, batch schedulers) the same way as on Ctrl+C
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            print("\n⏹  Stopping worker, running jobs will be requeued")
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            conn.execute("DELETE FROM workers WHERE id = ?", (self.worker_id,))
+            conn.close()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def default_devices():
+    """One slot per visible CUDA device, or a single CPU slot"""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return [str(i) for i in range(torch.cuda.device_count())]
+    except ImportError:
+        pass
+    return ["cpu"]
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)) if timestamp else "-"
+
+
+def print_jobs(rows):
+    print(f"{'ID':>4}  {'PRI':>4}  {'STATE':<10}  {'DEVICE':<6}  {'TRY':>3}  {'SUBMITTED':<19}  ARGS")
+    for row in rows:
+        print(
+            f"{row['id']:>4}  {row['priority']:>4}  {row['state']:<10}  {row['device'] or '-':<6}  "
+            f"{row['attempts']:>3}  {format_time(row['submitted_at']):<19}  {' '.join(json.loads(row['args']))}"
+        )
+
+
+def main():
+    """Main function with command-line interface"""
+    parser = argparse.ArgumentParser(
+        description="Local job queue for BoltzDesign1 binder generation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:")[1]
+    )
+    parser.add_argument("--db", type=str, default=str(DEFAULT_DB), help=f"Queue database (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_submit = sub.add_parser("submit", help="Queue a run_binder_generation.py job")
+    p_submit.add_argument("--priority", type=int, default=0, help="Higher runs first (default: 0)")
+    p_submit.add_argument("job_args", nargs=argparse.REMAINDER, help="Arguments for run_binder_generation.py (after --)")
+
+    p_list = sub.add_parser("list", help="Show jobs and workers")
+    p_list.add_argument("--active", action="store_true", help="Only queued and running jobs")
+
+    p_cancel = sub.add_parser("cancel", help="Cancel a queued or running job")
+    p_cancel.add_argument("job_id", type=int)
+
+    p_priority = sub.add_parser("priority", help="Change the priority of a queued job")
+    p_priority.add_argument("job_id", type=int)
+    p_priority.add_argument("priority", type=int)
+
+    p_worker = sub.add_parser("worker", help="Run jobs, one per device slot")
+    p_worker.add_argument("--devices", type=str, default=None,
+                          help="Comma-separated device slots, e.g. 0,1 or cpu,cpu (default: all GPUs, else cpu)")
+    p_worker.add_argument("--poll", type=float, default=5, help="Idle poll interval in seconds (default: 5)")
+    p_worker.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    p_worker.add_argument("--cpu-workers", type=int, default=0,
+                          help="Serve N CPU slots, each pinned to its own cores and NUMA node (overrides --devices)")
+    p_worker.add_argument("--metrics-port", type=int, default=0,
+                          help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics (default: off)")
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == "submit":
+        job_args = args.job_args[1:] if args.job_args[:1] == ["--"] else args.job_args
+        job_id = submit(conn, job_args, priority=args.priority)
+        print(f"✅ Submitted job {job_id} (priority {args.priority}, {queue_depth(conn)} queued)")
+
+    elif args.command == "list":
+        requeue_expired(conn)
+        print_jobs(list_jobs(conn, include_finished=not args.active))
+        workers = conn.execute("SELECT * FROM workers ORDER BY started_at").fetchall()
+        print(f"\n👷 Workers: {len(workers)}")
+        for worker in workers:
+            print(f"   {worker['id']}  devices={worker['devices']}  last heartbeat {format_time(worker['heartbeat_at'])}")
+
+    elif args.command == "cancel":
+        state = cancel(conn, args.job_id)
+        if state is None:
+            print(f"❌ Job {args.job_id} not found")
+            return 1
+        print(f"Job {args.job_id}: {state}")
+
+    elif args.command == "priority":
+        if not set_priority(conn, args.job_id, args.priority):
+            print(f"❌ Job {args.job_id} is not queued")
+            return 1
+        print(f"Job {args.job_id}: priority {args.priority}")
+
+    elif args.command == "worker":
+        devices = args.devices.split(",") if args.devices else default_devices()
+        cpu_slots = None
+        if args.cpu_workers > 0:
+            cpu_slots = partition_cpus(args.cpu_workers)
+            devices = ["cpu"] * len(cpu_slots)
+            describe_slots(cpu_slots)
+        conn.close()
+        Worker(args.db, devices, poll_seconds=args.poll, once=args.once,
+               metrics_port=args.metrics_port, cpu_slots=cpu_slots).run()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
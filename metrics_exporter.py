@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Prometheus metrics endpoint for BoltzDesign1 binder generation
+Serves throughput, stage latency, queue depth, success rate, worker memory
+and device metrics over plain HTTP on localhost
+
+Usage:
+  curl http://127.0.0.1:9464/metrics
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_PORT = 9464
+
+# Stage latencies range from seconds (filtering) to hours (design on CPU)
+LATENCY_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400, 28800)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters, gauges and histograms
+
+    Collectors registered with add_collector() are called on every scrape to
+    refresh gauges that are sampled rather than recorded (memory, devices).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.collectors = []
+        self.completions = deque()
+
+    def _metric(self, name, metric_type, help_text):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = {"type": metric_type, "help": help_text, "samples": {}}
+            self.metrics[name] = metric
+        return metric
+
+    def inc(self, name, value=1, help_text="", **labels):
+        """Increase a counter"""
+        with self.lock:
+            samples = self._metric(name, "counter", help_text)["samples"]
+            key = tuple(sorted(labels.items()))
+            samples[key] = samples.get(key, 0) + value
+
+    def set(self, name, value, help_text="", **labels):
+        """Set a gauge"""
+        with self.lock:
+            samples = self._metric(name, "gauge", help_text)["samples"]
+            samples[tuple(sorted(labels.items()))] = value
+
+    def clear(self, name):
+        """Drop all samples of a gauge (e.g. workers that have exited)"""
+        with self.lock:
+            if name in self.metrics:
+                self.metrics[name]["samples"].clear()
+
+    def observe(self, name, value, help_text="", buckets=LATENCY_BUCKETS, **labels):
+        """Record an observation in a histogram"""
+        with self.lock:
+            samples = self._metric(name, "histogram", help_text)["samples"]
+            key = tuple(sorted(labels.items()))
+            histogram = samples.get(key)
+            if histogram is None:
+                histogram = {"buckets": [[b, 0] for b in buckets] + [[float("inf"), 0]], "sum": 0.0, "count": 0}
+                samples[key] = histogram
+            for bucket in histogram["buckets"]:
+                if value <= bucket[0]:
+                    bucket[1] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def add_collector(self, collector):
+        """Register collector(registry), called before each scrape"""
+        self.collectors.append(collector)
+
+    def record_run(self, record):
+        """Update run metrics from a run_telemetry record"""
+        for stage, seconds in record.get("stage_seconds", {}).items():
+            self.observe("boltz_stage_latency_seconds", seconds, "Pipeline stage latency", stage=stage)
+        if "wall_seconds" in record:
+            self.observe("boltz_run_latency_seconds", record["wall_seconds"], "End-to-end run latency")
+
+        status = "succeeded" if record.get("success") else "failed"
+        self.inc("boltz_runs_total", 1, "Pipeline runs by outcome", status=status)
+        if not record.get("success"):
+            return
+
+        designs = record.get("design_samples", 0)
+        successes = record.get("successful_designs", 0)
+        now = time.time()
+        with self.lock:
+            self.completions.append((now, designs))
+        self.inc("boltz_designs_completed_total", designs, "Design samples completed")
+        self.inc("boltz_designs_successful_total", successes, "Designs written to 03_af_pdb_success")
+
+    def _refresh_derived(self):
+        now = time.time()
+        with self.lock:
+            while self.completions and self.completions[0][0] < now - 3600:
+                self.completions.popleft()
+            per_hour = sum(designs for _, designs in self.completions)
+            completed = sum(self.metrics.get("boltz_designs_completed_total", {}).get("samples", {}).values())
+            successful = sum(self.metrics.get("boltz_designs_successful_total", {}).get("samples", {}).values())
+        self.set("boltz_designs_completed_per_hour", per_hour, "Design samples completed in the last hour")
+        self.set("boltz_success_rate", successful / completed if completed else 0.0,
+                 "Fraction of completed designs that reached 03_af_pdb_success")
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        for collector in self.collectors:
+            try:
+                collector(self)
+            except Exception as e:
+                self.set("boltz_collector_errors", 1, "Collector failed during the last scrape",
+                         collector=getattr(collector, "__name__", "collector"), error=type(e).__name__)
+        self._refresh_derived()
+
+        lines = []
+        with self.lock:
+            for name in sorted(self.metrics):
+                metric = self.metrics[name]
+                lines.append(f"# HELP {name} {metric['help']}")
+                lines.append(f"# TYPE {name} {metric['type']}")
+                for key, value in metric["samples"].items():
+                    labels = dict(key)
+                    if metric["type"] != "histogram":
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                        continue
+                    for bound, count in value["buckets"]:
+                        bucket_labels = dict(labels, le=_format_value(float(bound)))
+                        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes(pid):
+    """Resident set size of a process, or None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def worker_rss_collector(get_workers):
+    """
+    Build a collector reporting RSS for each running worker process
+
+    Args:
+        get_workers: Callable returning a dict of {worker label: pid}
+    """
+    def collect_worker_rss(registry):
+        registry.clear("boltz_worker_rss_bytes")
+        for worker, pid in get_workers().items():
+            rss = process_rss_bytes(pid)
+            if rss is not None:
+                registry.set("boltz_worker_rss_bytes", rss, "Resident memory per worker process", worker=worker)
+    return collect_worker_rss
+
+
+def collect_device_metrics(registry):
+    """Report GPU memory and utilization; reports availability 0 on CPU-only hosts"""
+    if shutil.which("nvidia-smi"):
+        try:
+            result = subprocess.run(
+                ["nvidia-smi", "--query-gpu=index,utilization.gpu,memory.used,memory.total",
+                 "--format=csv,noheader,nounits"],
+                capture_output=True, text=True, timeout=5, check=True
+            )
+            for line in result.stdout.strip().splitlines():
+                index, util, used, total = [field.strip() for field in line.split(",")]
+                registry.set("boltz_device_utilization_ratio", float(util) / 100, "Device utilization", device=index)
+                registry.set("boltz_device_memory_used_bytes", float(used) * 1024 ** 2, "Device memory in use", device=index)
+                registry.set("boltz_device_memory_total_bytes", float(total) * 1024 ** 2, "Device memory capacity", device=index)
+            registry.set("boltz_device_metrics_available", 1, "Whether device metrics could be read")
+            return
+        except (subprocess.SubprocessError, ValueError, OSError):
+            pass
+    try:
+        import torch
+        if torch.cuda.is_available():
+            for i in range(torch.cuda.device_count()):
+                registry.set("boltz_device_memory_used_bytes", torch.cuda.memory_reserved(i), "Device memory in use", device=str(i))
+                registry.set("boltz_device_memory_total_bytes", torch.cuda.get_device_properties(i).total_memory,
+                             "Device memory capacity", device=str(i))
+            registry.set("boltz_device_metrics_available", 1, "Whether device metrics could be read")
+            return
+    except ImportError:
+        pass
+    registry.set("boltz_device_metrics_available", 0, "Whether device metrics could be read")
+
+
+def queue_depth_collector(db_path):
+    """Build a collector reporting jobs waiting in the job_queue database"""
+    def collect_queue_depth(registry):
+        import job_queue
+        conn = job_queue.connect(db_path)
+        try:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        finally:
+            conn.close()
+        counts = {state: count for state, count in rows}
+        registry.set("boltz_queue_depth", counts.get("queued", 0), "Jobs waiting for a device slot")
+        registry.set("boltz_jobs_running", counts.get("running", 0) + counts.get("cancelling", 0), "Jobs currently running")
+    return collect_queue_depth
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the pipeline output
+        pass
+
+
+def start_metrics_server(registry, port=DEFAULT_PORT, host="127.0.0.1"):
+    """
+    Serve registry on http://host:port/metrics from a daemon thread
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    registry.add_collector(collect_device_metrics)
+    registry.set("boltz_exporter_start_time_seconds", time.time(), "Exporter start time", pid=os.getpid())
+    print(f"📈 Metrics endpoint: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -1,90 +1,21 @@
 #!/bin/bash
-# Monitor background binder generation processes
-
-LOG_DIR="logs"
+# Monitor queued and running binder generation jobs
 
 echo "========================================="
-echo "Background Process Monitor"
+echo "Background Job Monitor"
 echo "========================================="
 echo ""
 
-# Find all PID files
-PID_FILES=$(ls -t $LOG_DIR/pid_*.txt 2>/dev/null)
-
-if [ -z "$PID_FILES" ]; then
-    echo "No background processes found."
-    echo ""
-    echo "Start a background process with:"
-    echo "  ./run_binder_background.sh"
-    exit 0
+if [ -d "boltz_venv" ]; then
+    source boltz_venv/bin/activate
 fi
 
-echo "Active and recent processes:"
-echo ""
-
-for PID_FILE in $PID_FILES; do
-    PID=$(cat "$PID_FILE" 2>/dev/null)
-    TIMESTAMP=$(basename "$PID_FILE" | sed 's/pid_//;s/.txt//')
-    LOG_FILE="$LOG_DIR/binder_gen_${TIMESTAMP}.log"
-    
-    echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-    echo "Process: $PID (started: $TIMESTAMP)"
-    
-    if ps -p $PID > /dev/null 2>&1; then
-        echo "Status: ✓ RUNNING"
-        
-        # Show process details
-        echo ""
-        ps -p $PID -o pid,user,%cpu,%mem,etime,cmd --no-headers
-        
-        # Show last few lines of log
-        if [ -f "$LOG_FILE" ]; then
-            echo ""
-            echo "Recent log output:"
-            echo "---"
-            tail -n 5 "$LOG_FILE"
-            echo "---"
-        fi
-        
-        echo ""
-        echo "Monitor this process:"
-        echo "  tail -f $LOG_FILE"
-        echo ""
-        echo "Kill this process:"
-        echo "  kill $PID"
-    else
-        echo "Status: ✗ COMPLETED or STOPPED"
-        
-        if [ -f "$LOG_FILE" ]; then
-            # Check for success/failure in log
-            if grep -q "SUCCESS" "$LOG_FILE" 2>/dev/null; then
-                echo "Result: ✓ SUCCESS"
-            elif grep -q "ERROR\|Traceback" "$LOG_FILE" 2>/dev/null; then
-                echo "Result: ✗ FAILED"
-                echo ""
-                echo "Last error lines:"
-                echo "---"
-                tail -n 10 "$LOG_FILE" | grep -A 5 -B 5 "ERROR\|Traceback" | tail -n 10
-                echo "---"
-            else
-                echo "Result: Unknown (check log file)"
-            fi
-        fi
-        
-        echo ""
-        echo "View log:"
-        echo "  cat $LOG_FILE"
-    fi
-    
-    echo ""
-done
+python3 job_queue.py list
 
-echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
 echo ""
 
-# Show GPU status if processes are running
-RUNNING_COUNT=$(ps -p $(cat $LOG_DIR/pid_*.txt 2>/dev/null | tr '\n' ',' | sed 's/,$//') 2>/dev/null | wc -l)
-if [ $RUNNING_COUNT -gt 1 ]; then
+# Show GPU status if jobs are running
+if python3 job_queue.py list --active | grep -q " running "; then
     echo "Current GPU Status:"
     echo "---"
     nvidia-smi --query-gpu=index,name,utilization.gpu,memory.used,memory.total --format=csv,noheader 2>/dev/null || echo "GPU info not available"
@@ -94,5 +25,7 @@ fi
 
 echo "Commands:"
 echo "  Monitor all:     watch -n 5 ./monitor_binder.sh"
+echo "  Submit job:      ./run_binder_background.sh"
+echo "  Cancel job:      python3 job_queue.py cancel <id>"
+echo "  Reprioritize:    python3 job_queue.py priority <id> <priority>"
 echo "  GPU status:      watch -n 5 nvidia-smi"
-echo "  Kill all:        pkill -f boltzdesign.py"
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Prior binders from earlier BoltzDesign1 campaigns
+Collects known-good binders (03_af_pdb_success) from earlier campaigns, e.g.
+to restrict a new campaign to the binder lengths that worked before
+"""
+
+import csv
+from pathlib import Path
+
+
+THREE_TO_ONE = {
+    "ALA": "A", "ARG": "R", "ASN": "N", "ASP": "D", "CYS": "C",
+    "GLN": "Q", "GLU": "E", "GLY": "G", "HIS": "H", "ILE": "I",
+    "LEU": "L", "LYS": "K", "MET": "M", "PHE": "F", "PRO": "P",
+    "SER": "S", "THR": "T", "TRP": "W", "TYR": "Y", "VAL": "V",
+    # Protonation-state names written by tLEaP/Amber
+    "HID": "H", "HIE": "H", "HIP": "H", "CYX": "C", "ASH": "D", "GLH": "E", "LYN": "K",
+}
+
+def read_pdb_sequences(pdb_path):
+    """
+    Read per-chain sequences from the CA atoms of a PDB file
+
+    Args:
+        pdb_path: Path to the PDB file
+
+    Returns:
+        Dict mapping chain ID to one-letter sequence, in file order
+    """
+    sequences = {}
+    seen = set()
+    with open(pdb_path, "r") as handle:
+        for line in handle:
+            if not line.startswith("ATOM") or line[12:16].strip() != "CA":
+                continue
+            chain = line[21].strip() or "A"
+            residue_key = (chain, line[22:27])
+            if residue_key in seen:
+                continue
+            seen.add(residue_key)
+            sequences.setdefault(chain, [])
+            sequences[chain].append(THREE_TO_ONE.get(line[17:20].strip(), "X"))
+    return {chain: "".join(seq) for chain, seq in sequences.items()}
+
+
+def find_success_dirs(source):
+    """Find all 03_af_pdb_success directories below a results directory"""
+    source = Path(source)
+    if source.name == "03_af_pdb_success":
+        return [source]
+    return sorted(source.glob("**/03_af_pdb_success"))
+
+
+def _score_column(fieldnames, key):
+    """Find the CSV column that holds a metric (case-insensitive substring match)"""
+    for name in fieldnames or []:
+        if key in name.lower():
+            return name
+    return None
+
+
+def load_catalog(source):
+    """
+    Load candidate binders from a results directory or a confidence-score CSV
+
+    Args:
+        source: Results directory (searched for 03_af_pdb_success) or a
+                high_iptm_confidence_scores.csv catalog file
+
+    Returns:
+        List of dicts with keys: name, pdb, iptm, plddt
+    """
+    source = Path(source).resolve()
+    if source.is_file():
+        catalogs = [source]
+    else:
+        catalogs = []
+        for success_dir in find_success_dirs(source):
+            csv_files = sorted(success_dir.glob("*.csv"))
+            if csv_files:
+                catalogs.extend(csv_files)
+            else:
+                # No scores written - fall back to the structures alone
+                catalogs.append(success_dir)
+
+    entries = []
+    for catalog in catalogs:
+        if catalog.is_dir():
+            for pdb in sorted(catalog.glob("*.pdb")):
+                entries.append({"name": pdb.stem, "pdb": pdb, "iptm": None, "plddt": None})
+            continue
+
+        pdb_dir = catalog.parent
+        with open(catalog, "r", newline="") as handle:
+            reader = csv.DictReader(handle)
+            iptm_col = _score_column(reader.fieldnames, "iptm")
+            plddt_col = _score_column(reader.fieldnames, "plddt")
+            name_col = reader.fieldnames[0] if reader.fieldnames else None
+            for row in reader:
+                name = Path(row.get(name_col, "")).stem
+                pdb = pdb_dir / f"{name}.pdb"
+                if not pdb.exists():
+                    matches = sorted(pdb_dir.glob(f"*{name}*.pdb"))
+                    if not matches:
+                        continue
+                    pdb = matches[0]
+                entries.append({
+                    "name": name,
+                    "pdb": pdb,
+                    "iptm": _to_float(row.get(iptm_col)),
+                    "plddt": _to_float(row.get(plddt_col)),
+                })
+    return entries
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def select_prior_binders(source, top=5, min_iptm=0.0, binder_chain=None):
+    """
+    Select the best prior binders from an earlier campaign
+
+    Args:
+        source: Results directory or confidence-score CSV from an earlier campaign
+        top: Maximum number of binders to select (ranked by iPTM)
+        min_iptm: Discard designs with a lower iPTM
+        binder_chain: Chain ID of the binder in the prior structures
+                      (default: last chain in each file)
+
+    Returns:
+        List of dicts with keys: name, sequence, chain, structure, iptm, plddt
+    """
+    entries = [
+        e for e in load_catalog(source)
+        if e["iptm"] is None or e["iptm"] >= min_iptm
+    ]
+    entries.sort(key=lambda e: (e["iptm"] is not None, e["iptm"] or 0.0), reverse=True)
+
+    binders = []
+    for entry in entries:
+        if len(binders) == top:
+            break
+        chains = read_pdb_sequences(entry["pdb"])
+        if not chains:
+            continue
+        chain = binder_chain if binder_chain in chains else list(chains)[-1]
+        binders.append({
+            "name": entry["name"],
+            "sequence": chains[chain],
+            "chain": chain,
+            "structure": str(entry["pdb"]),
+            "iptm": entry["iptm"],
+            "plddt": entry["plddt"],
+        })
+    return binders
@@ -8,9 +8,39 @@ import os
 import sys
 import subprocess
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 
+import job_queue
+import run_planner
+import run_telemetry
+from child_launcher import launch_command
+from cpu_affinity import (
+    INTRAOP_THREADS_ENV,
+    affinity_cpus,
+    cpu_worker_env,
+    describe_slots,
+    partition_cpus,
+    pinned_command,
+)
+from execution_modes import (
+    ACCURACY_COMPLEXES,
+    ACCURACY_SEED,
+    PRECISIONS,
+    boltz_input_yaml,
+    bootstrap_env,
+    collect_prediction_scores,
+    compare_accuracy,
+    execution_env,
+    print_accuracy_report,
+)
+from metrics_exporter import MetricsRegistry, start_metrics_server, worker_rss_collector
+from scratch_staging import RETENTION_POLICIES, ScratchUploader, make_scratch_dir
+from target_analysis import analyze_target, evaluate_site, print_patches, print_site_report, rank_patches
+from prior_binders import find_success_dirs, read_pdb_sequences, select_prior_binders
+
 
 def check_environment():
     """Check if we're running in the correct virtual environment"""
@@ -29,9 +59,17 @@ def check_environment():
 
 
 def find_boltzdesign_script():
-    """Find the boltzdesign.py script"""
+    """Find the boltzdesign.py script (BOLTZDESIGN_SCRIPT overrides the location)"""
     script_dir = Path(__file__).parent.resolve()
     
+    override = os.environ.get("BOLTZDESIGN_SCRIPT")
+    if override:
+        override = Path(override).resolve()
+        if override.exists():
+            return override
+        print(f"❌ BOLTZDESIGN_SCRIPT points to a missing file: {override}")
+        return None
+    
     # Check in BoltzDesign1 repo
     boltz_repo = script_dir / "BoltzDesign1"
     boltzdesign_script = boltz_repo / "boltzdesign.py"
@@ -45,6 +83,28 @@ def find_boltzdesign_script():
     return None
 
 
+def get_outputs_dir(boltz_repo, output_dir=None):
+    """Directory BoltzDesign1 writes run outputs to (relative output_dir is taken from boltz_repo)"""
+    if output_dir:
+        return (Path(boltz_repo) / output_dir).resolve() / "outputs"
+    return Path(boltz_repo) / "outputs"
+
+
+def _env_threads():
+    """Intra-op thread count set by a CPU worker for this process, or None"""
+    try:
+        return int(os.environ[INTRAOP_THREADS_ENV])
+    except (KeyError, ValueError):
+        return None
+
+
+def _arg_value(cmd, flag, convert=str):
+    """Value following `flag` in a command list, or None"""
+    if flag in cmd[:-1]:
+        return convert(cmd[cmd.index(flag) + 1])
+    return None
+
+
 def run_binder_generation(
     pdb_path,
     target_type="protein",
@@ -54,7 +114,15 @@ def run_binder_generation(
     suffix="boltz1",
     use_msa=True,
     output_dir=None,
-    additional_args=None
+    additional_args=None,
+    metrics=None,
+    precision=None,
+    compile=False,
+    compile_cache=None,
+    cpu_slot=None,
+    scratch_dir=None,
+    retention="results",
+    upload_interval=30
 ):
     """
     Run the BoltzDesign1 binder generation pipeline
@@ -69,6 +137,16 @@ def run_binder_generation(
         use_msa: Whether to use MSA for the target protein
         output_dir: Custom output directory (optional)
         additional_args: List of additional command-line arguments
+        metrics: MetricsRegistry to update with this run's results (optional)
+        precision: Numeric precision for design and validation: fp32, bf16 or
+                   tf32 (default: library default)
+        compile: Compile the model with torch.compile
+        compile_cache: Persistent compile cache directory (default: ~/.boltz/compile_cache)
+        cpu_slot: cpu_affinity.CpuSlot to pin this run to for CPU execution (optional)
+        scratch_dir: Node-local directory (tmpfs/NVMe) to run in; finished artifacts
+                     are copied to the output directory in the background (optional)
+        retention: Which scratch outputs to keep: final, results or all
+        upload_interval: Seconds between background upload sweeps
     """
     
     pdb_path = Path(pdb_path).resolve()
@@ -84,6 +162,8 @@ def run_binder_generation(
     print(f"🔗 Target Chains: {pdb_target_ids}")
     print(f"💻 GPU ID: {gpu_id}")
     print(f"🔬 Design Samples: {design_samples}")
+    if precision or compile:
+        print(f"⚙️  Execution Mode: {precision or 'default'}{' + compile' if compile else ''}")
     print(f"{'='*60}\n")
     
     # Find the boltzdesign.py script
@@ -93,10 +173,9 @@ def run_binder_generation(
     if not boltzdesign_script:
         return False
     
-    # Change to the BoltzDesign1 directory for execution
+    # Run from the BoltzDesign1 directory (passed as the subprocess cwd, so
+    # concurrent CPU workers in one process don't race on os.chdir)
     boltz_repo = boltzdesign_script.parent
-    original_dir = Path.cwd()
-    os.chdir(boltz_repo)
     
     try:
         # Build the command
@@ -117,45 +196,123 @@ def run_binder_generation(
         
         # Add custom output directory if specified
         if output_dir:
-            output_dir = Path(output_dir).resolve()
+            output_dir = (boltz_repo / output_dir).resolve()
             output_dir.mkdir(parents=True, exist_ok=True)
-            cmd.extend(["--work_dir", str(output_dir)])
+        outputs_dir = get_outputs_dir(boltz_repo, output_dir)
+        
+        # Stage the run on node-local scratch; finished artifacts are copied back
+        work_dir = output_dir
+        if scratch_dir:
+            work_dir = make_scratch_dir(scratch_dir, f"{target_type}_{target_name}_{suffix}")
+            print(f"💾 Scratch directory: {work_dir} (retaining '{retention}' outputs)")
+        if work_dir:
+            cmd.extend(["--work_dir", str(work_dir)])
         
         # Add any additional arguments
         if additional_args:
             cmd.extend(additional_args)
         
+        env = os.environ.copy()
+        result_dir = outputs_dir / f"{target_type}_{target_name}_{suffix}"
+        work_result_dir = get_outputs_dir(boltz_repo, work_dir) / result_dir.name
+        
+        # Precision and compilation apply to every Python process of the pipeline
+        if precision or compile:
+            execution_env(env, precision=precision or "fp32", compile=compile, compile_cache=compile_cache)
+        
+        # Pin CPU workers to their cores and memory node with matching thread pools
+        pin_cpus = None
+        if cpu_slot is not None:
+            cpu_worker_env(env, cpu_slot)
+            bootstrap_env(env)
+            cmd = pinned_command(cmd, cpu_slot)
+            pin_cpus = affinity_cpus(cpu_slot)
+        
         print("🚀 Running BoltzDesign1 pipeline...")
         print(f"Command: {' '.join(cmd)}\n")
         
+        uploader = None
+        if scratch_dir:
+            uploader = ScratchUploader(
+                work_result_dir, result_dir,
+                retention=retention, interval=upload_interval
+            ).start()
+        
         # Run the command
-        result = subprocess.run(
-            cmd,
-            check=True,
-            text=True,
-            capture_output=False  # Show output in real-time
-        )
+        start_time = time.time()
+        returncode = None
+        peak_rss_bytes = None
+        try:
+            # The pipeline is killed with this process, e.g. when a queue worker dies
+            process = subprocess.Popen(  # Show output in real-time
+                launch_command(cmd, cpus=pin_cpus), cwd=boltz_repo, text=True, env=env
+            )
+            if metrics is not None:
+                metrics.add_collector(worker_rss_collector(
+                    # poll() would reap the child before wait_with_peak_rss sees it
+                    lambda: {f"boltzdesign:{suffix}": process.pid} if process.returncode is None else {}
+                ))
+            returncode, peak_rss_bytes = run_telemetry.wait_with_peak_rss(process)
+            successful_designs = run_telemetry.count_successful_designs(work_result_dir, since=start_time)
+            stage_seconds = run_telemetry.stage_timings(work_result_dir, start_time)
+        finally:
+            if uploader is not None:
+                summary = uploader.finish(success=returncode == 0)
+                print(f"📤 Copied {summary['files']} file(s), {summary['bytes'] / 1024 ** 2:.1f} MB "
+                      f"from scratch to {result_dir}")
+                for error in summary["errors"]:
+                    print(f"   ⚠️  {error}")
+                # Keep scratch after a failure so nothing that was not copied is lost
+                if returncode == 0 and not summary["errors"]:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                else:
+                    print(f"   💾 Scratch kept at {work_dir}")
+        
+        record = run_telemetry.append_record({
+            "started_at": start_time,
+            "wall_seconds": time.time() - start_time,
+            "success": returncode == 0,
+            "returncode": returncode,
+            "target_name": target_name,
+            "target_type": target_type,
+            "target_residues": run_telemetry.count_target_residues(
+                pdb_path, [c.strip() for c in pdb_target_ids.split(",")]
+            ),
+            "length_min": _arg_value(cmd, "--length_min", int),
+            "length_max": _arg_value(cmd, "--length_max", int),
+            "design_samples": design_samples,
+            "successful_designs": successful_designs,
+            "stage_seconds": stage_seconds,
+            "peak_rss_bytes": peak_rss_bytes,
+            "device": "cpu" if cpu_slot is not None else run_telemetry.device_name(gpu_id),
+            "cpu_count": os.cpu_count(),
+            # Queue jobs on CPU slots get their thread count from the worker
+            "cpu_threads": cpu_slot.threads if cpu_slot is not None else _env_threads(),
+            "use_msa": use_msa,
+            "precision": precision or "default",
+            "compile": compile,
+            "scratch": bool(scratch_dir),
+        })
+        if metrics is not None:
+            metrics.record_run(record)
+        
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
         
         print(f"\n{'='*60}")
         print("✅ Binder generation completed successfully!")
         print(f"{'='*60}")
         
         # Print information about output location
-        if output_dir:
-            outputs_dir = output_dir / "outputs"
-        else:
-            outputs_dir = boltz_repo / "outputs"
-        
         print(f"\n📦 Results location:")
         print(f"   {outputs_dir}")
         
-        expected_result_dir = outputs_dir / f"{target_type}_{target_name}_{suffix}"
-        if expected_result_dir.exists():
+        if result_dir.exists():
             print(f"\n📁 Design output directory:")
-            print(f"   {expected_result_dir}")
+            print(f"   {result_dir}")
             
             # Look for successful designs
-            ligandmpnn_dir = list(expected_result_dir.glob("ligandmpnn_cutoff_*"))
+            ligandmpnn_dir = list(result_dir.glob("ligandmpnn_cutoff_*"))
             if ligandmpnn_dir:
                 success_dir = ligandmpnn_dir[0] / "03_af_pdb_success"
                 if success_dir.exists():
@@ -170,8 +327,215 @@ def run_binder_generation(
     except Exception as e:
         print(f"\n❌ Error: {e}")
         return False
-    finally:
-        os.chdir(original_dir)
+
+
+def repredict_complexes(input_dir, out_dir, gpu_id, precision, compile=False, compile_cache=None):
+    """
+    Predict the Boltz inputs in input_dir with a pinned seed in one execution mode
+
+    Returns:
+        True if `boltz predict` succeeded
+    """
+    env = execution_env(
+        os.environ.copy(), precision=precision, compile=compile,
+        compile_cache=compile_cache, seed=ACCURACY_SEED
+    )
+    env["CUDA_VISIBLE_DEVICES"] = str(gpu_id)
+    accelerator = "cpu" if run_telemetry.device_name(gpu_id) == "cpu" else "gpu"
+    cmd = [
+        sys.executable, "-m", "boltz.main", "predict", str(input_dir),
+        "--out_dir", str(out_dir),
+        "--accelerator", accelerator,
+        "--devices", "1",
+        "--override",
+    ]
+    print(f"🔁 Re-predicting in {precision}{' + compile' if compile else ''}: {' '.join(cmd)}")
+    return subprocess.run(cmd, env=env).returncode == 0
+
+
+def run_accuracy_check(args, run_kwargs):
+    """
+    Re-predict the same complexes in fp32 and in the selected execution mode,
+    then compare ipTM/pLDDT complex by complex
+
+    The complexes are the designs in 03_af_pdb_success of --accuracy-reference,
+    or of a fresh fp32 campaign on --pdb when no reference is given. Both
+    re-predictions use the same single-sequence inputs and seed, so the only
+    difference between them is the execution mode.
+    """
+    precision = args.precision or "fp32"
+    boltzdesign_script = find_boltzdesign_script()
+    if not boltzdesign_script:
+        return False
+    outputs_dir = get_outputs_dir(boltzdesign_script.parent, args.output_dir)
+    target_name = Path(args.pdb).stem
+    
+    reference_dir = args.accuracy_reference
+    if reference_dir is None:
+        suffix = f"{args.suffix}_acc_fp32"
+        if not run_binder_generation(suffix=suffix, precision="fp32", **run_kwargs):
+            return False
+        reference_dir = outputs_dir / f"{args.target_type}_{target_name}_{suffix}"
+    
+    complexes = [pdb for success_dir in find_success_dirs(reference_dir)
+                 for pdb in sorted(success_dir.glob("*.pdb"))][:ACCURACY_COMPLEXES]
+    if not complexes:
+        print(f"❌ No designs in 03_af_pdb_success below {reference_dir} to re-predict")
+        return False
+    
+    check_dir = outputs_dir / f"accuracy_{target_name}_{args.suffix}"
+    input_dir = check_dir / "inputs"
+    input_dir.mkdir(parents=True, exist_ok=True)
+    # Designs saved without their target get the target chains from --pdb
+    target = read_pdb_sequences(args.pdb)
+    target_chains = [c.strip() for c in args.target_chains.split(",") if c.strip() in target]
+    for pdb in complexes:
+        design = read_pdb_sequences(pdb)
+        sequences = {c: target[c] for c in target_chains if c not in design}
+        sequences.update(design)
+        (input_dir / f"{pdb.stem}.yaml").write_text(boltz_input_yaml(sequences))
+    print(f"🎯 Re-predicting {len(complexes)} complex(es) from {reference_dir}")
+    
+    scores = {}
+    modes = [("fp32", False), (precision, args.compile)]
+    for mode_precision, mode_compile in modes:
+        mode_dir = check_dir / f"{mode_precision}{'_compiled' if mode_compile else ''}"
+        if not repredict_complexes(input_dir, mode_dir, args.gpu_id, mode_precision,
+                                   compile=mode_compile, compile_cache=args.compile_cache):
+            return False
+        scores[(mode_precision, mode_compile)] = collect_prediction_scores(mode_dir)
+    
+    passed, rows = compare_accuracy(scores[modes[0]], scores[modes[1]])
+    print_accuracy_report(precision, args.compile, passed, rows)
+    return passed
+
+
+def run_cpu_workers(args, run_kwargs):
+    """
+    Split the design samples among CPU workers pinned to disjoint core sets
+
+    Each worker writes to its own output directory ({suffix}_cpu{i}).
+    """
+    slots = partition_cpus(min(args.cpu_workers, args.design_samples))
+    describe_slots(slots)
+    
+    samples, extra = divmod(args.design_samples, len(slots))
+    counts = [samples + (1 if slot.index < extra else 0) for slot in slots]
+    worker_kwargs = dict(run_kwargs)
+    worker_kwargs.pop("design_samples")
+    with ThreadPoolExecutor(max_workers=len(slots)) as pool:
+        futures = [
+            pool.submit(
+                run_binder_generation,
+                design_samples=counts[slot.index],
+                suffix=f"{args.suffix}_cpu{slot.index}",
+                precision=args.precision,
+                compile=args.compile,
+                cpu_slot=slot,
+                **worker_kwargs
+            )
+            for slot in slots
+        ]
+        results = [future.result() for future in futures]
+    
+    print(f"\n🧩 CPU workers finished: {sum(results)}/{len(results)} succeeded")
+    return all(results)
+
+
+def check_contact_site(args):
+    """
+    Check --contact_residues against the cached target surface analysis
+
+    Returns:
+        False when the site should be rejected (buried, scattered or unknown
+        residues), True otherwise or when the analysis is unavailable
+    """
+    chains = [c.strip() for c in args.target_chains.split(",")]
+    try:
+        analysis = analyze_target(args.pdb, chains)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"⚠️  Binding site not checked: {e}")
+        return True
+    report = evaluate_site(analysis, args.contact_residues, args.constraint_target or None)
+    print_site_report(report, args.contact_residues)
+    if report["problems"]:
+        print("   Choose another site (see --top-sites) or pass --skip-site-check to run anyway")
+        return False
+    return True
+
+
+def _without_flags(argv, flags_with_value, flags):
+    """Drop options (and their values) from a command line"""
+    kept = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in flags_with_value:
+            skip = "=" not in arg
+            continue
+        if name in flags:
+            continue
+        kept.append(arg)
+    return kept
+
+
+def run_site_campaigns(args, run_kwargs):
+    """
+    Run one campaign per top-ranked surface patch of the target
+
+    Each campaign constrains the binder to the patch's contact residues and
+    writes to its own output directory ({suffix}_site{rank}). With
+    --queue-sites the campaigns are submitted to the job queue instead, so
+    workers on different devices run them in parallel.
+    """
+    chains = [c.strip() for c in args.target_chains.split(",")]
+    try:
+        analysis = analyze_target(args.pdb, chains)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ Error: Target analysis failed: {e}")
+        return False
+    sites = rank_patches(analysis, top_k=args.top_sites)
+    if not sites:
+        print("❌ Error: No surface patch large enough for a binding site")
+        return False
+    print_patches(analysis, sites)
+    
+    if args.queue_sites:
+        base_args = _without_flags(
+            sys.argv[1:], {"--top-sites", "--suffix", "--metrics-port", "--metrics-linger"}, {"--queue-sites"}
+        )
+        # Each worker serves its own metrics; a queued job must not bind the same port
+        conn = job_queue.connect()
+        for site in sites:
+            job_id = job_queue.submit(conn, base_args + [
+                "--contact_residues", site["contacts"],
+                "--constraint_target", site["chain"],
+                "--suffix", f"{args.suffix}_site{site['rank']}",
+            ])
+            print(f"✅ Submitted job {job_id} for site {site['rank']} ({site['chain']}:{site['contacts']})")
+        return True
+    
+    results = []
+    for site in sites:
+        print(f"\n🧭 Site {site['rank']}/{len(sites)}: {site['chain']}:{site['contacts']}")
+        site_kwargs = dict(run_kwargs)
+        # Site options go last, as in the queued command, so they take precedence
+        site_kwargs["additional_args"] = run_kwargs["additional_args"] + [
+            "--contact_residues", site["contacts"],
+            "--constraint_target", site["chain"],
+        ]
+        results.append(run_binder_generation(
+            suffix=f"{args.suffix}_site{site['rank']}",
+            precision=args.precision,
+            compile=args.compile,
+            **site_kwargs
+        ))
+    
+    print(f"\n🧭 Site campaigns finished: {sum(results)}/{len(results)} succeeded")
+    return all(results)
 
 
 def main():
@@ -198,9 +562,28 @@ Examples:
 
   # Advanced: specify contact residues for binding site
   python run_binder_generation.py --contact_residues "100,101,105" --constraint_target A
+
+  # Rank the target's surface and run one campaign on each of the 3 best sites
+  python run_binder_generation.py --top-sites 3
+
+  # Reduced precision with graph compilation, checked against fp32 first
+  python run_binder_generation.py --precision bf16 --compile --accuracy-check
+
+  # CPU-only node: 4 workers, each pinned to its own cores and NUMA node
+  python run_binder_generation.py --design_samples 8 --cpu-workers 4
+
+  # Predict time, memory and yield from past runs and size a run for a deadline
+  python run_binder_generation.py plan --design_samples 20 --deadline 4h --max-workers 4
+
+  # Design binders with the lengths of the best binders from an earlier campaign
+  python run_binder_generation.py --length-from-prior BoltzDesign1/outputs/protein_af3_tleap_boltz1
         """
     )
     
+    # Planning only reads telemetry, so it does not need the environment
+    if sys.argv[1:2] == ["plan"]:
+        sys.exit(run_planner.main(sys.argv[2:]))
+    
     # Check environment first
     if not check_environment():
         sys.exit(1)
@@ -305,8 +688,167 @@ Examples:
         help="Disable LigandMPNN redesign step"
     )
     
+    # Binder length from earlier campaigns
+    parser.add_argument(
+        "--length-from-prior",
+        type=str,
+        default=None,
+        metavar="SOURCE",
+        help="Set --length_min/--length_max to the lengths of the best prior binders: "
+             "a results directory or a high_iptm_confidence_scores.csv catalog"
+    )
+    
+    parser.add_argument(
+        "--prior-top",
+        type=int,
+        default=5,
+        help="Number of prior binders to take lengths from, best iPTM first (default: 5)"
+    )
+    
+    parser.add_argument(
+        "--prior-min-iptm",
+        type=float,
+        default=0.0,
+        help="Ignore prior binders below this iPTM (default: 0.0)"
+    )
+    
+    parser.add_argument(
+        "--prior-chain",
+        type=str,
+        default=None,
+        help="Binder chain ID in the prior structures (default: last chain)"
+    )
+    
+    # Monitoring
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics during the run (default: off)"
+    )
+    parser.add_argument(
+        "--metrics-linger",
+        type=int,
+        default=60,
+        help="Seconds to keep the metrics endpoint up after the run finishes (default: 60)"
+    )
+    
+    # Execution mode
+    parser.add_argument(
+        "--precision",
+        type=str,
+        choices=PRECISIONS,
+        default=None,
+        help="Numeric precision for design and validation (default: library default)"
+    )
+    
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile the model with torch.compile, reusing a persistent compile cache"
+    )
+    
+    parser.add_argument(
+        "--compile-cache",
+        type=str,
+        default=None,
+        help="Compile cache directory (default: ~/.boltz/compile_cache)"
+    )
+    
+    parser.add_argument(
+        "--accuracy-check",
+        action="store_true",
+        help="Re-predict fixed designs in fp32 and in the selected --precision/--compile mode "
+             "and compare their ipTM/pLDDT instead of a normal run"
+    )
+    
+    parser.add_argument(
+        "--accuracy-reference",
+        type=str,
+        default=None,
+        help="Results directory whose 03_af_pdb_success designs the accuracy check re-predicts "
+             "(default: run a fresh fp32 campaign on --pdb)"
+    )
+    
+    # CPU execution
+    parser.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=0,
+        help="Run on CPU with N concurrent workers, each pinned to its own cores and "
+             "NUMA node; design samples are split among them (default: off)"
+    )
+    
+    # Scratch staging
+    parser.add_argument(
+        "--scratch-dir",
+        type=str,
+        default=None,
+        help="Run in this node-local directory (e.g. /dev/shm or local NVMe) and copy "
+             "finished artifacts to the output directory in the background"
+    )
+    
+    parser.add_argument(
+        "--retain",
+        type=str,
+        choices=list(RETENTION_POLICIES),
+        default="results",
+        help="Outputs copied back from scratch: final (03_af_pdb_success and scores), "
+             "results (all stage structures) or all (default: results)"
+    )
+    
+    parser.add_argument(
+        "--upload-interval",
+        type=int,
+        default=30,
+        help="Seconds between background upload sweeps from scratch (default: 30)"
+    )
+    
+    # Binding-site selection
+    parser.add_argument(
+        "--top-sites",
+        type=int,
+        default=0,
+        help="Rank surface patches of the target and run one campaign per top-K "
+             "patch, each constrained to that patch (default: off)"
+    )
+    
+    parser.add_argument(
+        "--queue-sites",
+        action="store_true",
+        help="With --top-sites, submit the site campaigns to the job queue instead of running them here"
+    )
+    
+    parser.add_argument(
+        "--skip-site-check",
+        action="store_true",
+        help="Run even when --contact_residues are buried or scattered over the target surface"
+    )
+    
     args = parser.parse_args()
     
+    if args.top_sites and args.contact_residues:
+        parser.error("--top-sites chooses the contact residues; do not combine it with --contact_residues")
+    if args.top_sites and args.constraint_target:
+        parser.error("--top-sites chooses the constraint target; do not combine it with --constraint_target")
+    if args.queue_sites and not args.top_sites:
+        parser.error("--queue-sites is only used with --top-sites")
+    modes = [flag for flag, enabled in (
+        ("--accuracy-check", args.accuracy_check),
+        ("--top-sites", args.top_sites > 0),
+        ("--cpu-workers", args.cpu_workers > 0),
+    ) if enabled]
+    if len(modes) > 1:
+        parser.error(f"{' and '.join(modes)} select different run modes; use one at a time")
+    if args.accuracy_reference and not args.accuracy_check:
+        parser.error("--accuracy-reference is only used with --accuracy-check")
+    if args.accuracy_check and args.target_type != "protein":
+        parser.error("--accuracy-check re-predicts protein complexes only")
+    
+    if args.contact_residues and args.target_type == "protein" and not args.skip_site_check:
+        if not check_contact_site(args):
+            sys.exit(1)
+    
     # Build additional arguments for boltzdesign.py
     additional_args = []
     
@@ -316,6 +858,20 @@ Examples:
     if args.constraint_target:
         additional_args.extend(["--constraint_target", args.constraint_target])
     
+    if args.length_from_prior:
+        prior = select_prior_binders(
+            args.length_from_prior,
+            top=args.prior_top,
+            min_iptm=args.prior_min_iptm,
+            binder_chain=args.prior_chain
+        )
+        if not prior:
+            print(f"❌ Error: No prior binders found in {args.length_from_prior}")
+            sys.exit(1)
+        lengths = [len(binder["sequence"]) for binder in prior]
+        args.length_min, args.length_max = min(lengths), max(lengths)
+        print(f"📏 Binder length {args.length_min}-{args.length_max} from {len(prior)} prior binder(s)")
+    
     additional_args.extend(["--length_min", str(args.length_min)])
     additional_args.extend(["--length_max", str(args.length_max)])
     
@@ -325,19 +881,50 @@ Examples:
     if args.no_ligandmpnn:
         additional_args.extend(["--run_ligandmpnn", "False"])
     
-    # Run the binder generation
-    success = run_binder_generation(
+    metrics = None
+    if args.metrics_port:
+        metrics = MetricsRegistry()
+        start_metrics_server(metrics, port=args.metrics_port)
+    
+    run_kwargs = dict(
         pdb_path=args.pdb,
         target_type=args.target_type,
         pdb_target_ids=args.target_chains,
         gpu_id=args.gpu_id,
         design_samples=args.design_samples,
-        suffix=args.suffix,
         use_msa=not args.no_msa,
         output_dir=args.output_dir,
-        additional_args=additional_args
+        additional_args=additional_args,
+        metrics=metrics,
+        compile_cache=args.compile_cache,
+        scratch_dir=args.scratch_dir,
+        retention=args.retain,
+        upload_interval=args.upload_interval
     )
     
+    if args.accuracy_check:
+        success = run_accuracy_check(args, run_kwargs)
+    elif args.top_sites > 0:
+        success = run_site_campaigns(args, run_kwargs)
+    elif args.cpu_workers > 0:
+        success = run_cpu_workers(args, run_kwargs)
+    else:
+        # Run the binder generation
+        success = run_binder_generation(
+            suffix=args.suffix,
+            precision=args.precision,
+            compile=args.compile,
+            **run_kwargs
+        )
+    
+    # Run metrics are recorded when the run ends; keep them up for a last scrape
+    if metrics is not None and args.metrics_linger > 0:
+        print(f"📈 Keeping the metrics endpoint up for {args.metrics_linger}s (Ctrl+C to exit)")
+        try:
+            time.sleep(args.metrics_linger)
+        except KeyboardInterrupt:
+            pass
+    
     if not success:
         sys.exit(1)
 
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Run planner for BoltzDesign1 binder generation
+Fits a cost model to the run telemetry history and predicts wall time, peak
+memory and design yield for a planned run, then recommends worker and sample
+counts that fit a deadline and a memory budget
+
+Usage:
+  python run_binder_generation.py plan --design_samples 20 --deadline 4h
+  python run_binder_generation.py plan --want 5 --deadline 90m --max-workers 4
+  python run_binder_generation.py plan --device cpu --cpu-threads 32 --memory-budget 64
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+from pathlib import Path
+
+import run_telemetry
+from execution_modes import PRECISIONS
+
+
+# Cost-model terms (see fit_wall_time). Each entry needs at least
+# `min_records` runs; the richest model the history supports is used.
+WALL_TIME_MODELS = [
+    ("quadratic", ["startup", "samples", "samples*tokens", "samples*tokens^2"], 8),
+    ("tokens^2", ["startup", "samples*tokens^2"], 3),
+    ("rate", ["samples*tokens^2"], 1),
+]
+MEMORY_MODELS = [
+    ("tokens^2", ["base", "tokens^2"], 3),
+    ("rate", ["tokens^2"], 1),
+]
+
+# Relative error assumed when the history is too short to estimate one
+DEFAULT_RELATIVE_ERROR = 0.25
+# One-sided z-score for the conservative (90th percentile) estimates
+CONSERVATIVE_Z = 1.28
+# Weight, in design samples, of the all-target yield when estimating one target's yield
+YIELD_PRIOR_SAMPLES = 4
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text):
+    """Parse a duration such as '4h', '90m', '2h30m' or '3600' into seconds"""
+    text = str(text).strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", text):
+        return float(text)
+    parts = re.findall(r"(\d+(?:\.\d+)?)\s*([smhd])", text)
+    if not parts or "".join(n + u for n, u in parts) != re.sub(r"\s+", "", text):
+        raise ValueError(f"Invalid duration '{text}', expected e.g. 4h, 90m, 2h30m or seconds")
+    return sum(float(number) * DURATION_UNITS[unit] for number, unit in parts)
+
+
+def format_duration(seconds):
+    seconds = max(int(round(seconds)), 0)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def record_tokens(record):
+    """Tokens the model folds in a run: target residues plus the mean binder length"""
+    return record["target_residues"] + (record["length_min"] + record["length_max"]) / 2
+
+
+def record_threads(record):
+    """Threads a CPU run computed with (None for GPU runs)"""
+    if (record.get("device") or "").lower() != "cpu":
+        return None
+    return record.get("cpu_threads") or record.get("cpu_count") or 1
+
+
+def usable_records(records):
+    """
+    Successful, complete runs suitable for fitting
+
+    Failed runs stop early, so they say little about a complete campaign.
+    """
+    usable = []
+    for record in records:
+        if not record.get("success"):
+            continue
+        if not record.get("design_samples") or not record.get("wall_seconds"):
+            continue
+        if None in (record.get("target_residues"), record.get("length_min"), record.get("length_max")):
+            continue
+        usable.append(record)
+    return usable
+
+
+def select_history(records, device, precision=None):
+    """
+    Pick the records that best describe the planned hardware
+
+    Returns:
+        Tuple (records, basis) where basis describes the filter that was used
+    """
+    device = device.lower()
+    on_device = [r for r in records if device in (r.get("device") or "").lower()]
+    if precision:
+        same_mode = [r for r in on_device if (r.get("precision") or "fp32") == precision]
+        if same_mode:
+            return same_mode, f"{device}, {precision}"
+    if on_device:
+        return on_device, device
+    return records, "all devices (no history on this device)"
+
+
+def _solve(rows, targets, ridge=1e-9):
+    """
+    Least-squares fit of targets ~ rows by the normal equations
+
+    Columns are scaled to unit mean magnitude first so the tiny ridge term
+    only matters for degenerate histories (e.g. every run the same size).
+    """
+    width = len(rows[0])
+    scales = []
+    for j in range(width):
+        magnitude = sum(abs(row[j]) for row in rows) / len(rows)
+        scales.append(magnitude or 1.0)
+    scaled = [[row[j] / scales[j] for j in range(width)] for row in rows]
+
+    matrix = [[sum(r[i] * r[j] for r in scaled) + (ridge if i == j else 0.0) for j in range(width)]
+              for i in range(width)]
+    vector = [sum(r[i] * t for r, t in zip(scaled, targets)) for i in range(width)]
+
+    # Gaussian elimination with partial pivoting
+    for col in range(width):
+        pivot = max(range(col, width), key=lambda i: abs(matrix[i][col]))
+        matrix[col], matrix[pivot] = matrix[pivot], matrix[col]
+        vector[col], vector[pivot] = vector[pivot], vector[col]
+        if abs(matrix[col][col]) < 1e-15:
+            return None
+        for i in range(col + 1, width):
+            factor = matrix[i][col] / matrix[col][col]
+            for j in range(col, width):
+                matrix[i][j] -= factor * matrix[col][j]
+            vector[i] -= factor * vector[col]
+    coefficients = [0.0] * width
+    for i in reversed(range(width)):
+        coefficients[i] = (vector[i] - sum(matrix[i][j] * coefficients[j] for j in range(i + 1, width))) / matrix[i][i]
+    return [c / s for c, s in zip(coefficients, scales)]
+
+
+def _wall_features(terms, samples, tokens, threads):
+    # Per-sample compute on CPU is fitted in core-seconds and shared among threads
+    per_sample = samples / threads if threads else samples
+    values = {
+        "startup": 1.0,
+        "samples": per_sample,
+        "samples*tokens": per_sample * tokens,
+        "samples*tokens^2": per_sample * tokens ** 2,
+    }
+    return [values[term] for term in terms]
+
+
+def _memory_features(terms, tokens):
+    values = {"base": 1.0, "tokens^2": tokens ** 2}
+    return [values[term] for term in terms]
+
+
+class FittedModel:
+    """A linear cost model over named terms with a relative error estimate"""
+
+    def __init__(self, name, terms, coefficients, relative_error, records, featurize):
+        self.name = name
+        self.terms = terms
+        self.coefficients = coefficients
+        self.relative_error = relative_error
+        self.records = records
+        self.featurize = featurize
+
+    def predict(self, *args):
+        return sum(c * x for c, x in zip(self.coefficients, self.featurize(self.terms, *args)))
+
+    def conservative(self, *args):
+        return self.predict(*args) * (1 + CONSERVATIVE_Z * self.relative_error)
+
+
+def _fit(models, records, featurize, features_of, target_of, probe):
+    """Fit the richest model the history supports that makes a positive prediction at `probe`"""
+    for name, terms, min_records in models:
+        if len(records) < min_records:
+            continue
+        rows = [featurize(terms, *features_of(r)) for r in records]
+        targets = [target_of(r) for r in records]
+        coefficients = _solve(rows, targets)
+        if coefficients is None or any(c < 0 for c in coefficients):
+            continue
+        model = FittedModel(name, terms, coefficients, DEFAULT_RELATIVE_ERROR, len(records), featurize)
+        if model.predict(*probe) <= 0:
+            continue
+        dof = len(records) - len(terms)
+        if dof >= 2:
+            errors = [(model.predict(*features_of(r)) - target_of(r)) / target_of(r) for r in records]
+            model.relative_error = max(math.sqrt(sum(e * e for e in errors) / dof), 0.02)
+        return model
+    return None
+
+
+def fit_wall_time(records, probe):
+    """
+    Fit wall_seconds = startup + samples / threads * (b0 + b1*tokens + b2*tokens^2)
+
+    Tokens are target residues plus the mean binder length; the quadratic
+    term follows the pair representation that dominates Boltz's cost. GPU
+    runs use threads = 1.
+    """
+    return _fit(
+        WALL_TIME_MODELS, records, _wall_features,
+        lambda r: (r["design_samples"], record_tokens(r), record_threads(r)),
+        lambda r: r["wall_seconds"],
+        probe,
+    )
+
+
+def fit_peak_memory(records, tokens):
+    """Fit peak_rss_bytes = base + c * tokens^2 (independent of the sample count)"""
+    records = [r for r in records if r.get("peak_rss_bytes")]
+    return _fit(
+        MEMORY_MODELS, records, _memory_features,
+        lambda r: (record_tokens(r),),
+        lambda r: r["peak_rss_bytes"],
+        (tokens,),
+    )
+
+
+def estimate_yield(records, target_name=None):
+    """
+    Fraction of design samples that pass the filters
+
+    The target's own history is shrunk towards the all-target rate, so a
+    target with few runs does not get a yield of 0% or 100%.
+
+    Returns:
+        Tuple (rate, samples_observed_for_target)
+    """
+    total_samples = sum(r["design_samples"] for r in records)
+    total_success = sum(r.get("successful_designs") or 0 for r in records)
+    overall = (total_success + 1) / (total_samples + 2)
+    own = [r for r in records if target_name and r.get("target_name") == target_name]
+    own_samples = sum(r["design_samples"] for r in own)
+    own_success = sum(r.get("successful_designs") or 0 for r in own)
+    rate = (own_success + YIELD_PRIOR_SAMPLES * overall) / (own_samples + YIELD_PRIOR_SAMPLES)
+    return rate, own_samples
+
+
+def plan_workers(wall_model, memory_model, samples, tokens, threads, max_workers,
+                 deadline=None, memory_budget=None):
+    """
+    Predict each worker count from 1 to max_workers
+
+    Samples are split evenly, as with --cpu-workers or one queue job per GPU.
+    CPU workers share `threads` cores; GPU workers get one device each.
+
+    Returns:
+        List of dicts with workers, samples_per_worker, wall, conservative
+        wall, memory and whether the deadline and budget are met
+    """
+    options = []
+    for workers in range(1, max_workers + 1):
+        worker_threads = max(threads // workers, 1) if threads else None
+        per_worker = math.ceil(samples / workers)
+        memory = memory_model.conservative(tokens) * workers if memory_model else None
+        conservative = wall_model.conservative(per_worker, tokens, worker_threads)
+        options.append({
+            "workers": workers,
+            "threads_per_worker": worker_threads,
+            "samples_per_worker": per_worker,
+            "wall_seconds": wall_model.predict(per_worker, tokens, worker_threads),
+            "wall_seconds_p90": conservative,
+            "memory_bytes_p90": memory,
+            "meets_deadline": deadline is None or conservative <= deadline,
+            "fits_memory": memory_budget is None or memory is None or memory <= memory_budget,
+        })
+    return options
+
+
+def max_samples_within(wall_model, deadline, tokens, threads, workers):
+    """Largest sample count `workers` workers can finish before the deadline"""
+    worker_threads = max(threads // workers, 1) if threads else None
+    per_worker = 0
+    while wall_model.conservative(per_worker + 1, tokens, worker_threads) <= deadline:
+        per_worker += 1
+        if per_worker >= 100000:
+            break
+    return per_worker * workers
+
+
+def default_device():
+    """Name of the first GPU, or 'cpu'"""
+    return run_telemetry.device_name(0)
+
+
+def build_plan(args):
+    """Fit the models and assemble the plan for the parsed command-line arguments"""
+    history = usable_records(run_telemetry.read_records(args.history))
+    if not history:
+        return None, "No usable run telemetry yet; complete at least one run first"
+
+    device = args.device or default_device()
+    if device.lower() == "cpu":
+        device = "cpu"
+    records, basis = select_history(history, device, args.precision)
+
+    target_residues = args.target_residues
+    if target_residues is None:
+        target_residues = run_telemetry.count_target_residues(
+            args.pdb, [c.strip() for c in args.target_chains.split(",")]
+        )
+    tokens = target_residues + (args.length_min + args.length_max) / 2
+    threads = None
+    if device == "cpu":
+        threads = args.cpu_threads or os.cpu_count() or 1
+
+    yield_rate, target_samples = estimate_yield(history, Path(args.pdb).stem)
+    samples = args.design_samples
+    if args.want:
+        samples = max(math.ceil(args.want / yield_rate), 1)
+
+    wall_model = fit_wall_time(records, (samples, tokens, threads))
+    if wall_model is None:
+        return None, f"Could not fit a wall-time model from {len(records)} run(s) on {basis}"
+    memory_model = fit_peak_memory(records, tokens)
+
+    deadline = parse_duration(args.deadline) if args.deadline else None
+    memory_budget = args.memory_budget * 1024 ** 3 if args.memory_budget else None
+    options = plan_workers(wall_model, memory_model, samples, tokens, threads, args.max_workers,
+                           deadline, memory_budget)
+    feasible = [o for o in options if o["meets_deadline"] and o["fits_memory"]]
+    recommended = feasible[0] if feasible else None
+
+    plan = {
+        "device": device,
+        "basis": basis,
+        "history_runs": len(records),
+        "target_residues": target_residues,
+        "tokens": tokens,
+        "cpu_threads": threads,
+        "design_samples": samples,
+        "wall_model": {"name": wall_model.name, "relative_error": wall_model.relative_error,
+                       "coefficients": dict(zip(wall_model.terms, wall_model.coefficients))},
+        "memory_model": None if memory_model is None else {
+            "name": memory_model.name, "relative_error": memory_model.relative_error,
+            "coefficients": dict(zip(memory_model.terms, memory_model.coefficients))},
+        "yield_rate": yield_rate,
+        "yield_target_samples": target_samples,
+        "expected_designs": samples * yield_rate,
+        "p_at_least_one": 1 - (1 - yield_rate) ** samples,
+        "deadline_seconds": deadline,
+        "memory_budget_bytes": memory_budget,
+        "options": options,
+        "recommended": recommended,
+    }
+    if deadline is not None and recommended is None:
+        fitting = [o["workers"] for o in options if o["fits_memory"]] or [1]
+        best = max(fitting, key=lambda w: max_samples_within(wall_model, deadline, tokens, threads, w))
+        plan["max_samples_within_deadline"] = {
+            "workers": best,
+            "design_samples": max_samples_within(wall_model, deadline, tokens, threads, best),
+        }
+    return plan, None
+
+
+def print_plan(plan, want=None):
+    gib = 1024 ** 3
+    print(f"\n{'='*60}")
+    print("📐 Run plan")
+    print(f"{'='*60}")
+    print(f"Device: {plan['device']}" + (f" ({plan['cpu_threads']} threads)" if plan["cpu_threads"] else ""))
+    print(f"History: {plan['history_runs']} run(s) on {plan['basis']}")
+    print(f"Target: {plan['target_residues']} residues, {plan['tokens']:.0f} tokens with binder")
+    print(f"Wall-time model: {plan['wall_model']['name']} "
+          f"(±{plan['wall_model']['relative_error']:.0%})")
+    if plan["memory_model"]:
+        print(f"Memory model: {plan['memory_model']['name']} "
+              f"(±{plan['memory_model']['relative_error']:.0%})")
+
+    print(f"\n🎯 Yield: {plan['yield_rate']:.1%} of samples pass "
+          f"({plan['yield_target_samples']} sample(s) of history on this target)")
+    if want:
+        print(f"   {plan['design_samples']} sample(s) needed for {want} expected design(s)")
+    print(f"   {plan['design_samples']} sample(s) → {plan['expected_designs']:.1f} expected design(s), "
+          f"P(at least one) = {plan['p_at_least_one']:.0%}")
+
+    print(f"\n   {'WORKERS':>7} {'SAMPLES/W':>9} {'WALL':>9} {'WALL p90':>9} {'MEM p90':>9}")
+    for option in plan["options"]:
+        memory = f"{option['memory_bytes_p90'] / gib:.1f}G" if option["memory_bytes_p90"] else "-"
+        flags = ""
+        if not option["meets_deadline"]:
+            flags += " ⏰"
+        if not option["fits_memory"]:
+            flags += " 💾"
+        print(f"   {option['workers']:>7} {option['samples_per_worker']:>9} "
+              f"{format_duration(option['wall_seconds']):>9} {format_duration(option['wall_seconds_p90']):>9} "
+              f"{memory:>9}{flags}")
+
+    recommended = plan["recommended"]
+    if plan["deadline_seconds"] is None and plan["memory_budget_bytes"] is None:
+        return
+    limits = []
+    if plan["deadline_seconds"] is not None:
+        limits.append(f"deadline {format_duration(plan['deadline_seconds'])}")
+    if plan["memory_budget_bytes"] is not None:
+        limits.append(f"memory {plan['memory_budget_bytes'] / gib:.0f}G")
+    if recommended:
+        print(f"\n✅ Recommended: {recommended['workers']} worker(s) × {recommended['samples_per_worker']} "
+              f"sample(s), done in ~{format_duration(recommended['wall_seconds_p90'])} (p90) "
+              f"within {', '.join(limits)}")
+    else:
+        print(f"\n❌ No worker count meets {', '.join(limits)}")
+        best = plan.get("max_samples_within_deadline")
+        if best and best["design_samples"]:
+            print(f"   At most {best['design_samples']} sample(s) fit the deadline, "
+                  f"with {best['workers']} worker(s)")
+
+
+def main(argv=None):
+    """Command-line interface for `run_binder_generation.py plan`"""
+    parser = argparse.ArgumentParser(
+        prog="run_binder_generation.py plan",
+        description="Predict cost and yield of a binder generation run from past telemetry",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:")[1]
+    )
+    parser.add_argument("--pdb", type=str, default="_inputs/af3_tleap.pdb",
+                        help="Path to input PDB file (default: _inputs/af3_tleap.pdb)")
+    parser.add_argument("--target_chains", type=str, default="A",
+                        help="Comma-separated chain IDs for target (default: A)")
+    parser.add_argument("--target-residues", type=int, default=None,
+                        help="Target size in residues (default: counted from --pdb)")
+    parser.add_argument("--design_samples", type=int, default=2,
+                        help="Number of binder designs to plan for (default: 2)")
+    parser.add_argument("--want", type=int, default=None,
+                        help="Plan enough samples for this many expected successful designs")
+    parser.add_argument("--length_min", type=int, default=100, help="Minimum binder length (default: 100)")
+    parser.add_argument("--length_max", type=int, default=150, help="Maximum binder length (default: 150)")
+    parser.add_argument("--device", type=str, default=None,
+                        help="Device name or substring, e.g. A100 or cpu (default: this machine's first GPU, else cpu)")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="Cores available to CPU workers (default: all CPUs)")
+    parser.add_argument("--precision", choices=PRECISIONS, default=None,
+                        help="Prefer history recorded with this precision")
+    parser.add_argument("--max-workers", type=int, default=1,
+                        help="Largest worker count (GPUs or CPU workers) to consider (default: 1)")
+    parser.add_argument("--deadline", type=str, default=None,
+                        help="Time budget, e.g. 4h, 90m or 2h30m")
+    parser.add_argument("--memory-budget", type=float, default=None,
+                        help="Host memory budget in GiB shared by all workers")
+    parser.add_argument("--history", type=str, default=None,
+                        help=f"Telemetry file (default: {run_telemetry.DEFAULT_TELEMETRY_FILE})")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        plan, error = build_plan(args)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    if error:
+        print(f"❌ {error}")
+        return 1
+    if args.json:
+        print(json.dumps(plan, indent=2))
+    else:
+        print_plan(plan, want=args.want)
+    return 0 if plan["recommended"] or plan["deadline_seconds"] is None else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Run telemetry for BoltzDesign1 binder generation
+Derives per-stage timings from the output directory and appends one JSON
+record per run to a history file shared by all runs on this machine
+"""
+
+import json
+import os
+import platform
+import socket
+import time
+from pathlib import Path
+
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEFAULT_TELEMETRY_FILE = SCRIPT_DIR / "logs" / "run_telemetry.jsonl"
+TELEMETRY_FILE_ENV = "BOLTZ_TELEMETRY_FILE"
+JOB_ID_ENV = "BOLTZ_JOB_ID"
+
+# Pipeline stages in execution order and the output directory each one fills
+STAGES = [
+    ("design", "results_final"),
+    ("ligandmpnn", "01_lmpnn_redesigned*"),
+    ("alphafold", "02_design_*af3"),
+    ("filter", "03_af_pdb_success"),
+]
+
+
+def telemetry_file():
+    """History file used by this process (BOLTZ_TELEMETRY_FILE overrides the default)"""
+    return Path(os.environ.get(TELEMETRY_FILE_ENV, DEFAULT_TELEMETRY_FILE))
+
+
+def _newest_mtime(directory, since):
+    """Newest modification time of files written below `directory` after `since`"""
+    newest = None
+    for path in directory.rglob("*"):
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        if mtime >= since and (newest is None or mtime > newest):
+            newest = mtime
+    return newest
+
+
+def stage_timings(result_dir, start_time, end_time=None):
+    """
+    Estimate how long each pipeline stage took from its output files
+
+    A stage ends when the last file in its output directory was written and
+    starts when the previous stage ended. Stages that wrote nothing during
+    this run (skipped or resumed) are left out.
+
+    Args:
+        result_dir: Run output directory ({target_type}_{target_name}_{suffix})
+        start_time: Epoch time the run started
+        end_time: Epoch time the run finished (default: now)
+
+    Returns:
+        Dict mapping stage name to seconds
+    """
+    result_dir = Path(result_dir)
+    end_time = end_time or time.time()
+    timings = {}
+    previous_end = start_time
+    for stage, pattern in STAGES:
+        stage_end = None
+        for directory in result_dir.glob(f"**/{pattern}"):
+            if directory.is_dir():
+                mtime = _newest_mtime(directory, start_time)
+                if mtime is not None and (stage_end is None or mtime > stage_end):
+                    stage_end = mtime
+        if stage_end is None:
+            continue
+        stage_end = min(stage_end, end_time)
+        timings[stage] = max(stage_end - previous_end, 0.0)
+        previous_end = stage_end
+    return timings
+
+
+def count_successful_designs(result_dir, since=0.0):
+    """Number of structures written to 03_af_pdb_success since `since`"""
+    count = 0
+    for success_dir in Path(result_dir).glob("**/03_af_pdb_success"):
+        for pdb in success_dir.glob("*.pdb"):
+            if pdb.stat().st_mtime >= since:
+                count += 1
+    return count
+
+
+def count_target_residues(pdb_path, chains=None):
+    """Number of target residues (CA atoms) in the selected chains"""
+    residues = set()
+    with open(pdb_path, "r") as handle:
+        for line in handle:
+            if line.startswith(("ATOM", "HETATM")) and line[12:16].strip() == "CA":
+                chain = line[21].strip() or "A"
+                if chains is None or chain in chains:
+                    residues.add((chain, line[22:27]))
+    return len(residues)
+
+
+def wait_with_peak_rss(process):
+    """
+    Wait for a child process and measure its peak memory
+
+    Uses wait4() on the child itself, so the peak covers this child and the
+    processes it waited for, not every child this process has ever started.
+    Where wait4() is unavailable (Windows) the peak is not measured.
+
+    Args:
+        process: subprocess.Popen of the child
+
+    Returns:
+        Tuple of (return code, peak resident set size in bytes or None)
+    """
+    if not hasattr(os, "wait4"):
+        return process.wait(), None
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    peak = usage.ru_maxrss if platform.system() == "Darwin" else usage.ru_maxrss * 1024
+    return process.returncode, peak
+
+
+def device_name(gpu_id=0):
+    """Name of the device a run used, or 'cpu'"""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return torch.cuda.get_device_name(gpu_id)
+    except ImportError:
+        pass
+    return "cpu"
+
+
+def append_record(record, path=None):
+    """Append one run record to the telemetry history"""
+    path = Path(path) if path else telemetry_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = dict(record)
+    record.setdefault("host", socket.gethostname())
+    record.setdefault("job_id", os.environ.get(JOB_ID_ENV))
+    line = json.dumps(record, sort_keys=True) + "\n"
+    # A single O_APPEND write keeps concurrent runs from interleaving lines
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+    return record
+
+
+def read_records(path=None):
+    """Read all run records from the telemetry history, skipping corrupt lines"""
+    path = Path(path) if path else telemetry_file()
+    if not path.exists():
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
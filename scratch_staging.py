@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Node-local scratch staging for BoltzDesign1 binder generation
+Runs the pipeline in a local scratch directory (tmpfs or NVMe) and streams
+finished artifacts to the final output directory from a background thread,
+with SHA-256 checksums, a manifest and a completion marker
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import socket
+import threading
+import time
+from pathlib import Path
+
+
+# Files (relative to the run's result directory) kept at the destination per policy;
+# everything else stays on scratch and is dropped with it
+RETENTION_POLICIES = {
+    "final": [
+        "*03_af_pdb_success/*",
+        "*.csv",
+    ],
+    "results": [
+        "*03_af_pdb_success/*",
+        "*.csv",
+        "*results_final/*",
+        "*01_lmpnn_redesigned*/*",
+        "*02_design_*af3/*",
+        "*.yaml",
+    ],
+    "all": ["*"],
+}
+
+MANIFEST_NAME = "MANIFEST.sha256"
+COMPLETE_MARKER = "_COMPLETE"
+COPY_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def make_scratch_dir(scratch_root, run_name):
+    """Create a unique per-run directory under the scratch root"""
+    scratch = Path(scratch_root) / f"{run_name}_{socket.gethostname()}_{os.getpid()}_{int(time.time())}"
+    scratch.mkdir(parents=True, exist_ok=False)
+    return scratch
+
+
+def copy_with_checksum(source, destination):
+    """
+    Copy a file in large chunks, hashing it on the way
+
+    The copy is written next to the destination and renamed into place, so
+    readers of the final directory never see a partial file.
+
+    Returns:
+        Hex SHA-256 of the copied data
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = destination.with_name(f".{destination.name}.part")
+    digest = hashlib.sha256()
+    with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+        while True:
+            chunk = src.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(source, tmp_path)
+    os.replace(tmp_path, destination)
+    return digest.hexdigest()
+
+
+class ScratchUploader:
+    """
+    Background uploader from a scratch outputs directory to its destination
+
+    Args:
+        scratch_dir: Result directory the pipeline writes to on scratch
+        destination_dir: Final result directory (e.g. on the network filesystem)
+        retention: Key of RETENTION_POLICIES selecting which files are kept
+        interval: Seconds between upload sweeps while the run is active
+        settle_seconds: Only upload files unchanged for this long during the run
+    """
+
+    def __init__(self, scratch_dir, destination_dir, retention="results", interval=30, settle_seconds=10):
+        if retention not in RETENTION_POLICIES:
+            raise ValueError(f"Unknown retention policy '{retention}', expected one of {list(RETENTION_POLICIES)}")
+        self.scratch_dir = Path(scratch_dir)
+        self.destination_dir = Path(destination_dir)
+        self.patterns = RETENTION_POLICIES[retention]
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.uploaded = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+        # Latest failure per file; cleared when a later sweep copies it
+        self.errors = {}
+
+    @property
+    def bytes_uploaded(self):
+        """Size of the uploaded files, each counted once however often it was re-uploaded"""
+        return sum(signature[0] for signature, _ in self.uploaded.values())
+
+    def retained(self, relative_path):
+        return any(fnmatch.fnmatch(relative_path, pattern) for pattern in self.patterns)
+
+    def pending_files(self, settle_seconds):
+        """Retained files that are new or changed since their last upload"""
+        now = time.time()
+        pending = []
+        # os.walk skips directories the pipeline removes while it runs
+        for root, dirs, files in os.walk(self.scratch_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if name.startswith("."):
+                    continue
+                path = Path(root) / name
+                relative = path.relative_to(self.scratch_dir).as_posix()
+                if not self.retained(relative):
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    # Temporary file deleted since the directory was listed
+                    continue
+                if now - stat.st_mtime < settle_seconds:
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if self.uploaded.get(relative, (None,))[0] != signature:
+                    pending.append((relative, path, signature))
+        return pending
+
+    def sweep(self, settle_seconds=None):
+        """Upload one batch of pending files"""
+        settle = self.settle_seconds if settle_seconds is None else settle_seconds
+        for relative, path, signature in self.pending_files(settle):
+            try:
+                checksum = copy_with_checksum(path, self.destination_dir / relative)
+            except FileNotFoundError:
+                # Deleted on scratch before it could be copied; nothing to keep
+                self.errors.pop(relative, None)
+                continue
+            except OSError as e:
+                self.errors[relative] = f"{relative}: {e}"
+                continue
+            self.uploaded[relative] = (signature, checksum)
+            self.errors.pop(relative, None)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.sweep()
+            except OSError as e:
+                # Keep streaming; finish() sweeps again and reports what is left
+                self.errors["sweep"] = f"sweep: {e}"
+
+    def start(self):
+        """Start streaming finished artifacts in the background"""
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def finish(self, success=True):
+        """
+        Stop the background thread, upload everything left, write the
+        manifest and verify the copies against it; the completion marker is
+        only written for successful runs without copy errors
+
+        Returns:
+            Dict summary with files, bytes and errors
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.errors.pop("sweep", None)
+        try:
+            self.sweep(settle_seconds=0)
+        except OSError as e:
+            self.errors["sweep"] = f"sweep: {e}"
+
+        self.destination_dir.mkdir(parents=True, exist_ok=True)
+        manifest_lines = [
+            f"{checksum}  {relative}" for relative, (_, checksum) in sorted(self.uploaded.items())
+        ]
+        manifest = self.destination_dir / MANIFEST_NAME
+        tmp_manifest = manifest.with_name(f".{MANIFEST_NAME}.part")
+        tmp_manifest.write_text("\n".join(manifest_lines) + "\n", encoding="utf-8")
+        os.replace(tmp_manifest, manifest)
+
+        # Re-read the copies before the run is marked complete
+        for relative in verify_manifest(self.destination_dir):
+            self.errors[relative] = f"{relative}: does not match {MANIFEST_NAME}"
+
+        summary = {
+            "files": len(self.uploaded),
+            "bytes": self.bytes_uploaded,
+            "errors": list(self.errors.values()),
+            "manifest": MANIFEST_NAME,
+            "completed_at": time.time(),
+        }
+        if success and not self.errors:
+            (self.destination_dir / COMPLETE_MARKER).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary
+
+
+def verify_manifest(destination_dir):
+    """
+    Re-hash uploaded files against the manifest
+
+    Returns:
+        List of relative paths that are missing or do not match
+    """
+    destination_dir = Path(destination_dir)
+    mismatched = []
+    manifest = destination_dir / MANIFEST_NAME
+    for line in manifest.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        checksum, relative = line.split("  ", 1)
+        path = destination_dir / relative
+        if not path.exists():
+            mismatched.append(relative)
+            continue
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(COPY_CHUNK_BYTES), b""):
+                digest.update(chunk)
+        if digest.hexdigest() != checksum:
+            mismatched.append(relative)
+    return mismatched
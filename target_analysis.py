@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Target surface analysis for BoltzDesign1 binder generation
+Computes per-residue solvent accessibility, surface patches and their
+neighbor graph once per target and caches the result, so candidate binding
+sites can be ranked, or a --contact_residues site checked, in milliseconds
+before any design time is spent
+
+Usage:
+  python target_analysis.py _inputs/af3_tleap.pdb --top 5
+  python target_analysis.py _inputs/af3_tleap.pdb --check "100,101,105"
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+from prior_binders import THREE_TO_ONE
+
+
+ANALYSIS_VERSION = 1
+DEFAULT_CACHE_DIR = Path.home() / ".boltz" / "target_analysis"
+
+# Shrake-Rupley parameters
+PROBE_RADIUS = 1.4
+SPHERE_POINTS = 96
+VDW_RADII = {"C": 1.70, "N": 1.55, "O": 1.52, "S": 1.80, "P": 1.80, "SE": 1.90}
+DEFAULT_RADIUS = 1.80
+# Atoms per block when searching neighbors; bounds the distance matrix size
+ATOM_BLOCK = 256
+
+# Theoretical maximum SASA per residue type (Tien et al. 2013), in A^2
+MAX_ASA = {
+    "A": 129.0, "R": 274.0, "N": 195.0, "D": 193.0, "C": 167.0,
+    "E": 223.0, "Q": 225.0, "G": 104.0, "H": 224.0, "I": 197.0,
+    "L": 201.0, "K": 236.0, "M": 224.0, "F": 240.0, "P": 159.0,
+    "S": 155.0, "T": 172.0, "W": 285.0, "Y": 263.0, "V": 174.0,
+}
+DEFAULT_MAX_ASA = 250.0
+
+# Residues above this relative SASA count as surface residues
+SURFACE_THRESHOLD = 0.20
+# Residues with heavy atoms closer than this are neighbors in the graph (A)
+CONTACT_CUTOFF = 5.0
+# Surface residues whose centroids lie within this distance of a patch center (A)
+PATCH_RADIUS = 10.0
+# Smallest exposed area worth designing a binder against (A^2)
+MIN_PATCH_AREA = 400.0
+
+# Heuristic weight of each residue type at protein-protein interfaces, after
+# the hot-spot enrichment of Trp, Arg and Tyr reported by Bogan & Thorn (1998)
+HOTSPOT_PROPENSITY = {
+    "W": 2.0, "R": 1.6, "Y": 1.6, "I": 1.3, "F": 1.3, "L": 1.2, "M": 1.2,
+    "H": 1.2, "D": 1.1, "P": 1.0, "N": 1.0, "Q": 1.0, "C": 1.0, "V": 1.0,
+    "T": 0.8, "E": 0.8, "G": 0.7, "A": 0.7, "K": 0.7, "S": 0.6,
+}
+# Weight of the apolar fraction of a patch's exposed area in its score
+APOLAR_WEIGHT = 1.0
+
+# Residues passed to --contact_residues for each ranked site
+SITE_CONTACTS = 6
+# A --contact_residues site is rejected when fewer than this fraction of its
+# residues are on the surface or when its residues span more than MAX_SITE_SPAN
+MIN_SITE_EXPOSED_FRACTION = 0.5
+MAX_SITE_SPAN = 20.0
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Target analysis needs numpy; run it inside the BoltzDesign1 environment")
+    return numpy
+
+
+def _element(line):
+    element = line[76:78].strip().upper()
+    if element:
+        return element
+    # tLEaP writes no element column; fall back to the atom name (e.g. 1HB -> H)
+    name = line[12:16].strip().lstrip("0123456789").upper()
+    if line[17:20].strip() == "MSE" and name.startswith("SE"):
+        return "SE"
+    return name[:1]
+
+
+def read_heavy_atoms(pdb_path, chains=None):
+    """
+    Read heavy atoms of the target residues from a PDB file
+
+    Residue positions count from 1 within each chain, as in
+    --contact_residues; chains without an ID are read as chain A.
+
+    Args:
+        pdb_path: Path to the PDB file
+        chains: Chain IDs to keep (default: all)
+
+    Returns:
+        Tuple (residues, atoms): residues is a list of dicts with chain,
+        position, resnum and resname; atoms is a list of
+        (residue index, x, y, z, element)
+    """
+    residues = []
+    atoms = []
+    index = {}
+    positions = {}
+    with open(pdb_path, "r") as handle:
+        for line in handle:
+            if not line.startswith("ATOM"):
+                continue
+            if line[16] not in (" ", "A"):
+                continue
+            element = _element(line)
+            if element in ("H", "D"):
+                continue
+            chain = line[21].strip() or "A"
+            if chains and chain not in chains:
+                continue
+            key = (chain, line[22:27])
+            if key not in index:
+                positions[chain] = positions.get(chain, 0) + 1
+                index[key] = len(residues)
+                residues.append({
+                    "chain": chain,
+                    "position": positions[chain],
+                    "resnum": line[22:27].strip(),
+                    "resname": line[17:20].strip(),
+                })
+            atoms.append((index[key], float(line[30:38]), float(line[38:46]), float(line[46:54]), element))
+    return residues, atoms
+
+
+def sphere_points(count=SPHERE_POINTS):
+    """Evenly spread points on the unit sphere (golden-section spiral)"""
+    np = _numpy()
+    k = np.arange(count) + 0.5
+    z = 1 - 2 * k / count
+    radius = np.sqrt(1 - z * z)
+    theta = math.pi * (3 - math.sqrt(5)) * k
+    return np.stack([radius * np.cos(theta), radius * np.sin(theta), z], axis=1)
+
+
+def atom_sasa_and_contacts(coords, radii, residue_of, probe=PROBE_RADIUS, points=SPHERE_POINTS,
+                           contact_cutoff=CONTACT_CUTOFF):
+    """
+    Shrake-Rupley SASA per atom, plus the residue pairs in contact
+
+    Neighbor search runs over blocks of atoms against all atoms, so memory
+    stays bounded by ATOM_BLOCK x atoms distances.
+
+    Returns:
+        Tuple (sasa per atom, set of (residue, residue) contact pairs)
+    """
+    np = _numpy()
+    sphere = sphere_points(points)
+    expanded = radii + probe
+    reach = max(2 * expanded.max(), contact_cutoff)
+    sasa = np.zeros(len(coords))
+    contacts = set()
+    for start in range(0, len(coords), ATOM_BLOCK):
+        block = coords[start:start + ATOM_BLOCK]
+        d2 = ((block[:, None, :] - coords[None, :, :]) ** 2).sum(axis=-1)
+
+        touching = d2 < contact_cutoff ** 2
+        rows, cols = np.nonzero(touching)
+        pairs = np.stack([residue_of[rows + start], residue_of[cols]], axis=1)
+        pairs = pairs[pairs[:, 0] < pairs[:, 1]]
+        contacts.update(map(tuple, np.unique(pairs, axis=0).tolist()))
+
+        overlapping = (d2 < (expanded[start:start + ATOM_BLOCK, None] + expanded[None, :]) ** 2) & (d2 < reach ** 2)
+        for i in range(len(block)):
+            atom = start + i
+            neighbors = np.flatnonzero(overlapping[i])
+            neighbors = neighbors[neighbors != atom]
+            surface = coords[atom] + expanded[atom] * sphere
+            if len(neighbors):
+                diff = surface[:, None, :] - coords[neighbors][None, :, :]
+                buried = ((diff ** 2).sum(axis=-1) < expanded[neighbors] ** 2).any(axis=1)
+                exposed = points - int(buried.sum())
+            else:
+                exposed = points
+            sasa[atom] = 4 * math.pi * expanded[atom] ** 2 * exposed / points
+    return sasa, contacts
+
+
+def compute_analysis(pdb_path, chains=None):
+    """
+    Compute per-residue SASA, the residue neighbor graph and surface patches
+
+    Returns:
+        Analysis dict (see analyze_target)
+    """
+    np = _numpy()
+    start_time = time.perf_counter()
+    residues, atoms = read_heavy_atoms(pdb_path, chains)
+    if not atoms:
+        raise ValueError(f"No target atoms found in {pdb_path} (chains: {chains or 'all'})")
+
+    residue_of = np.array([atom[0] for atom in atoms])
+    coords = np.array([atom[1:4] for atom in atoms], dtype=float)
+    elements = [atom[4] for atom in atoms]
+    radii = np.array([VDW_RADII.get(element, DEFAULT_RADIUS) for element in elements])
+    apolar = np.array([element in ("C", "S") for element in elements])
+
+    sasa, contacts = atom_sasa_and_contacts(coords, radii, residue_of)
+
+    count = len(residues)
+    residue_sasa = np.bincount(residue_of, weights=sasa, minlength=count)
+    residue_apolar = np.bincount(residue_of, weights=sasa * apolar, minlength=count)
+    atom_counts = np.bincount(residue_of, minlength=count)
+    centroids = np.stack(
+        [np.bincount(residue_of, weights=coords[:, axis], minlength=count) for axis in range(3)], axis=1
+    ) / atom_counts[:, None]
+
+    neighbors = [[] for _ in range(count)]
+    for a, b in sorted(contacts):
+        neighbors[a].append(b)
+        neighbors[b].append(a)
+
+    for i, residue in enumerate(residues):
+        code = THREE_TO_ONE.get(residue["resname"], "X")
+        residue["code"] = code
+        residue["sasa"] = round(float(residue_sasa[i]), 2)
+        residue["apolar_sasa"] = round(float(residue_apolar[i]), 2)
+        residue["rel_sasa"] = round(float(residue_sasa[i]) / MAX_ASA.get(code, DEFAULT_MAX_ASA), 4)
+        residue["centroid"] = [round(float(v), 3) for v in centroids[i]]
+
+    surface = [i for i, residue in enumerate(residues) if residue["rel_sasa"] >= SURFACE_THRESHOLD]
+    surface_set = set(surface)
+    patches = []
+    for center in surface:
+        distance = np.sqrt(((centroids - centroids[center]) ** 2).sum(axis=1))
+        nearby = {i for i in surface if distance[i] <= PATCH_RADIUS}
+        # Keep only residues connected to the center across the surface, so a
+        # patch does not bridge a groove or wrap around a thin region
+        members = {center}
+        frontier = [center]
+        while frontier:
+            current = frontier.pop()
+            for neighbor in neighbors[current]:
+                if neighbor in nearby and neighbor not in members and neighbor in surface_set:
+                    members.add(neighbor)
+                    frontier.append(neighbor)
+        patches.append({"center": center, "members": sorted(members)})
+
+    return {
+        "version": ANALYSIS_VERSION,
+        "pdb": str(pdb_path),
+        "chains": sorted({residue["chain"] for residue in residues}),
+        "heavy_atoms": len(atoms),
+        "residues": residues,
+        "neighbors": neighbors,
+        "surface": surface,
+        "patches": patches,
+        "computed_seconds": round(time.perf_counter() - start_time, 3),
+    }
+
+
+def cache_path(pdb_path, chains=None, cache_dir=None):
+    """Cache file for a target; keyed on the PDB contents, chains and analysis version"""
+    digest = hashlib.sha256()
+    digest.update(Path(pdb_path).read_bytes())
+    digest.update(json.dumps([sorted(chains or []), ANALYSIS_VERSION, PROBE_RADIUS, SPHERE_POINTS,
+                              SURFACE_THRESHOLD, CONTACT_CUTOFF, PATCH_RADIUS]).encode())
+    cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+    return cache_dir / f"{Path(pdb_path).stem}_{digest.hexdigest()[:16]}.json"
+
+
+def analyze_target(pdb_path, chains=None, cache_dir=None, refresh=False):
+    """
+    Load the cached surface analysis of a target, computing it on first use
+
+    Args:
+        pdb_path: Target PDB file
+        chains: Target chain IDs (default: all)
+        cache_dir: Cache directory (default: ~/.boltz/target_analysis)
+        refresh: Recompute even when a cached analysis exists
+
+    Returns:
+        Dict with residues (chain, position, resname, sasa, rel_sasa,
+        apolar_sasa, centroid), neighbors (adjacency lists), surface
+        (residue indices) and patches (center and member indices)
+    """
+    path = cache_path(pdb_path, chains, cache_dir)
+    if path.exists() and not refresh:
+        try:
+            analysis = json.loads(path.read_text(encoding="utf-8"))
+            analysis["cached"] = True
+            return analysis
+        except json.JSONDecodeError:
+            pass
+
+    analysis = compute_analysis(pdb_path, chains)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+    tmp_path.write_text(json.dumps(analysis), encoding="utf-8")
+    os.replace(tmp_path, path)
+    analysis["cached"] = False
+    return analysis
+
+
+def score_residues(analysis, members):
+    """
+    Score a set of residues as a binding site
+
+    The score is the exposure-weighted mean hot-spot propensity plus
+    APOLAR_WEIGHT times the apolar fraction of the exposed area.
+
+    Returns:
+        Tuple (score, exposed area, apolar fraction)
+    """
+    residues = analysis["residues"]
+    area = sum(residues[i]["sasa"] for i in members)
+    if area <= 0:
+        return 0.0, 0.0, 0.0
+    propensity = sum(residues[i]["sasa"] * HOTSPOT_PROPENSITY.get(residues[i]["code"], 1.0) for i in members) / area
+    apolar_fraction = sum(residues[i]["apolar_sasa"] for i in members) / area
+    return propensity + APOLAR_WEIGHT * apolar_fraction, area, apolar_fraction
+
+
+def site_contacts(analysis, members, count=SITE_CONTACTS):
+    """Most exposed, highest-propensity residues of a patch, in sequence order"""
+    residues = analysis["residues"]
+    weight = lambda i: residues[i]["sasa"] * HOTSPOT_PROPENSITY.get(residues[i]["code"], 1.0)
+    chosen = sorted(members, key=weight, reverse=True)[:count]
+    return sorted(chosen, key=lambda i: (residues[i]["chain"], residues[i]["position"]))
+
+
+def format_contacts(analysis, indices):
+    """Residue indices as a --contact_residues string"""
+    return ",".join(str(analysis["residues"][i]["position"]) for i in indices)
+
+
+def rank_patches(analysis, top_k=5, min_area=MIN_PATCH_AREA, max_overlap=0.5):
+    """
+    Rank surface patches as candidate binding sites
+
+    Works on the cached analysis only, so it takes milliseconds. Patches
+    sharing more than `max_overlap` of their residues (Jaccard) with a
+    better-ranked patch are skipped, so the top sites are distinct.
+
+    Returns:
+        List of dicts with rank, chain, center, members, contacts (a
+        --contact_residues string), area, apolar_fraction and score
+    """
+    scored = []
+    for patch in analysis["patches"]:
+        score, area, apolar_fraction = score_residues(analysis, patch["members"])
+        if area >= min_area:
+            scored.append((score, area, apolar_fraction, patch))
+    scored.sort(key=lambda item: item[0], reverse=True)
+
+    ranked = []
+    for score, area, apolar_fraction, patch in scored:
+        members = set(patch["members"])
+        if any(len(members & site["_members"]) / len(members | site["_members"]) > max_overlap for site in ranked):
+            continue
+        center = analysis["residues"][patch["center"]]
+        ranked.append({
+            "rank": len(ranked) + 1,
+            "chain": center["chain"],
+            "center": f"{center['resname']}{center['position']}",
+            "members": format_contacts(analysis, patch["members"]),
+            "contacts": format_contacts(analysis, site_contacts(analysis, patch["members"])),
+            "area": round(area, 1),
+            "apolar_fraction": round(apolar_fraction, 3),
+            "score": round(score, 3),
+            "_members": members,
+        })
+        if len(ranked) == top_k:
+            break
+    for site in ranked:
+        del site["_members"]
+    return ranked
+
+
+def evaluate_site(analysis, contact_residues, chain=None):
+    """
+    Check a --contact_residues site against the target surface
+
+    Args:
+        analysis: Output of analyze_target()
+        contact_residues: Comma-separated residue positions, e.g. "100,101,105"
+        chain: Chain of the positions (default: first target chain)
+
+    Returns:
+        Dict with score, exposed_fraction, span, components and a list of
+        problems; the site should be rejected when problems is non-empty
+    """
+    chain = chain or analysis["chains"][0]
+    lookup = {(r["chain"], r["position"]): i for i, r in enumerate(analysis["residues"])}
+    problems = []
+    members = []
+    for token in str(contact_residues).split(","):
+        token = token.strip()
+        if not token:
+            continue
+        try:
+            position = int(token)
+        except ValueError:
+            problems.append(f"'{token}' is not a residue position")
+            continue
+        if (chain, position) not in lookup:
+            problems.append(f"residue {chain}{position} is not in the target")
+            continue
+        members.append(lookup[(chain, position)])
+    if not members:
+        return {"chain": chain, "residues": 0, "problems": problems or ["no contact residues given"]}
+
+    residues = analysis["residues"]
+    surface = set(analysis["surface"])
+    exposed = [i for i in members if i in surface]
+    exposed_fraction = len(exposed) / len(members)
+    if exposed_fraction < MIN_SITE_EXPOSED_FRACTION:
+        buried = ", ".join(f"{residues[i]['resname']}{residues[i]['position']}" for i in members if i not in surface)
+        problems.append(f"only {len(exposed)}/{len(members)} residues are solvent exposed (buried: {buried})")
+
+    span = max(
+        (math.dist(residues[a]["centroid"], residues[b]["centroid"]) for a in members for b in members),
+        default=0.0,
+    )
+    if span > MAX_SITE_SPAN:
+        problems.append(f"residues span {span:.1f} A, more than one binder can cover ({MAX_SITE_SPAN:.0f} A)")
+
+    # Residues connected through the neighbor graph within PATCH_RADIUS of each other
+    remaining = set(members)
+    components = 0
+    while remaining:
+        components += 1
+        frontier = [remaining.pop()]
+        while frontier:
+            current = frontier.pop()
+            for other in list(remaining):
+                if other in analysis["neighbors"][current] or \
+                        math.dist(residues[current]["centroid"], residues[other]["centroid"]) <= PATCH_RADIUS:
+                    remaining.discard(other)
+                    frontier.append(other)
+    if components > 1:
+        problems.append(f"residues form {components} separate groups on the surface")
+
+    score, area, apolar_fraction = score_residues(analysis, members)
+    return {
+        "chain": chain,
+        "residues": len(members),
+        "exposed_fraction": round(exposed_fraction, 3),
+        "span": round(span, 1),
+        "components": components,
+        "area": round(area, 1),
+        "apolar_fraction": round(apolar_fraction, 3),
+        "score": round(score, 3),
+        "problems": problems,
+    }
+
+
+def print_patches(analysis, ranked):
+    print(f"\n{'='*60}")
+    print(f"🧭 Candidate binding sites: {Path(analysis['pdb']).name}")
+    print(f"{'='*60}")
+    print(f"{len(analysis['residues'])} residues, {analysis['heavy_atoms']} heavy atoms, "
+          f"{len(analysis['surface'])} on the surface, {len(analysis['patches'])} patches")
+    print(f"\n   {'RANK':>4} {'CHAIN':>5} {'CENTER':>8} {'AREA':>7} {'APOLAR':>6} {'SCORE':>6}  CONTACT RESIDUES")
+    for site in ranked:
+        print(f"   {site['rank']:>4} {site['chain']:>5} {site['center']:>8} {site['area']:>7.0f} "
+              f"{site['apolar_fraction']:>6.0%} {site['score']:>6.2f}  {site['contacts']}")
+
+
+def print_site_report(report, contact_residues):
+    status = "❌" if report["problems"] else "✅"
+    print(f"\n{status} Binding site {report['chain']}:{contact_residues}")
+    if "score" in report:
+        print(f"   {report['exposed_fraction']:.0%} exposed, span {report['span']:.1f} A, "
+              f"area {report['area']:.0f} A^2, score {report['score']:.2f}")
+    for problem in report["problems"]:
+        print(f"   ⚠️  {problem}")
+
+
+def main():
+    """Main function with command-line interface"""
+    parser = argparse.ArgumentParser(
+        description="Surface analysis and binding-site ranking for a BoltzDesign1 target",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:")[1]
+    )
+    parser.add_argument("pdb", nargs="?", default="_inputs/af3_tleap.pdb",
+                        help="Target PDB file (default: _inputs/af3_tleap.pdb)")
+    parser.add_argument("--target_chains", type=str, default=None,
+                        help="Comma-separated target chain IDs (default: all)")
+    parser.add_argument("--top", type=int, default=5, help="Number of sites to list (default: 5)")
+    parser.add_argument("--min-area", type=float, default=MIN_PATCH_AREA,
+                        help=f"Smallest exposed patch area in A^2 (default: {MIN_PATCH_AREA:.0f})")
+    parser.add_argument("--check", type=str, default=None,
+                        help="Check a --contact_residues site instead of ranking, e.g. '100,101,105'")
+    parser.add_argument("--constraint_target", type=str, default=None,
+                        help="Chain of the --check residues (default: first target chain)")
+    parser.add_argument("--cache-dir", type=str, default=None,
+                        help=f"Analysis cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--refresh", action="store_true", help="Recompute the cached analysis")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    chains = [c.strip() for c in args.target_chains.split(",")] if args.target_chains else None
+    try:
+        analysis = analyze_target(args.pdb, chains, args.cache_dir, refresh=args.refresh)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    if not args.json:
+        source = "cache" if analysis["cached"] else f"computed in {analysis['computed_seconds']:.2f}s"
+        print(f"🗺️  Surface analysis loaded from {source}")
+
+    start = time.perf_counter()
+    if args.check:
+        result = evaluate_site(analysis, args.check, args.constraint_target)
+    else:
+        result = rank_patches(analysis, top_k=args.top, min_area=args.min_area)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.check:
+        print_site_report(result, args.check)
+    else:
+        print_patches(analysis, result)
+        print(f"\n⏱  Ranked in {elapsed_ms:.1f} ms")
+    if args.check and result["problems"]:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
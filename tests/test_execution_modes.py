@@ -0,0 +1,48 @@
+"""Tests for the execution-mode start-up hook"""
+
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import execution_modes  # noqa: E402
+
+MODE_ENV = ("BOLTZ_PRECISION", "BOLTZ_COMPILE", "BOLTZ_SEED", "BOLTZ_INTRAOP_THREADS", "BOLTZ_INTEROP_THREADS")
+
+
+def run_hooked(code, extra_path=None, **env_vars):
+    env = {k: v for k, v in os.environ.items() if k not in MODE_ENV}
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [str(extra_path or "")] if p)
+    execution_modes.bootstrap_env(env)
+    env.update(env_vars)
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+
+
+def test_hook_runs_the_sitecustomize_it_shadows(tmp_path):
+    (tmp_path / "sitecustomize.py").write_text("import builtins\nbuiltins.shadowed_hook_ran = True\n")
+    result = run_hooked("import builtins; print(getattr(builtins, 'shadowed_hook_ran', False))", tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "True\n"
+
+
+def test_hook_seeds_generators():
+    result = run_hooked("import random; print(random.random())", BOLTZ_SEED="5")
+    assert result.returncode == 0, result.stderr
+    assert float(result.stdout) == random.Random(5).random()
+
+
+def test_failed_apply_is_fatal_when_a_mode_was_requested():
+    result = run_hooked("print('ran')", BOLTZ_SEED="5", BOLTZ_INTRAOP_THREADS="not-a-number")
+    assert result.returncode == 1
+    assert "ran" not in result.stdout
+    assert "Execution mode requested but not applied" in result.stderr
+
+
+def test_failed_apply_only_warns_without_a_requested_mode():
+    result = run_hooked("print('ran')", BOLTZ_INTRAOP_THREADS="not-a-number")
+    assert result.returncode == 0
+    assert result.stdout == "ran\n"
+    assert "Execution mode not applied" in result.stderr
@@ -0,0 +1,261 @@
+"""Tests for the job queue lease/requeue/cancel state machine and job lifetime"""
+
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+
+import job_queue  # noqa: E402
+from child_launcher import launch_command  # noqa: E402
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = job_queue.connect(tmp_path / "jobs.sqlite")
+    yield conn
+    conn.close()
+
+
+def state(conn, job_id):
+    return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+def expire_leases(conn):
+    return job_queue.requeue_expired(conn, now=time.time() + job_queue.LEASE_SECONDS + 1)
+
+
+def test_lease_takes_highest_priority_then_oldest(conn):
+    low = job_queue.submit(conn, ["--suffix", "low"])
+    high = job_queue.submit(conn, ["--suffix", "high"], priority=5)
+    also_low = job_queue.submit(conn, ["--suffix", "low2"])
+
+    assert job_queue.lease(conn, "w1", "0")["id"] == high
+    assert job_queue.lease(conn, "w1", "1")["id"] == low
+    assert job_queue.lease(conn, "w1", "2")["id"] == also_low
+    assert job_queue.lease(conn, "w1", "3") is None
+
+
+def test_lease_marks_job_running(conn):
+    job_id = job_queue.submit(conn, [])
+    job = job_queue.lease(conn, "w1", "0")
+    assert job["state"] == "running"
+    assert job["worker"] == "w1"
+    assert job["device"] == "0"
+    assert job["attempts"] == 1
+    assert job["lease_expires"] > time.time()
+    assert job_queue.queue_depth(conn) == 0
+    assert state(conn, job_id)["state"] == "running"
+
+
+def test_finish_records_outcome(conn):
+    ok = job_queue.submit(conn, [])
+    bad = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    job_queue.lease(conn, "w1", "1")
+    job_queue.finish(conn, ok, "w1", 0)
+    job_queue.finish(conn, bad, "w1", 1)
+    assert state(conn, ok)["state"] == "succeeded"
+    assert state(conn, bad)["state"] == "failed"
+    assert state(conn, bad)["returncode"] == 1
+
+
+def test_finish_ignored_for_worker_that_lost_the_job(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    expire_leases(conn)
+    job_queue.lease(conn, "w2", "0")
+    job_queue.finish(conn, job_id, "w1", 1)
+    assert state(conn, job_id)["state"] == "running"
+    assert state(conn, job_id)["worker"] == "w2"
+
+
+def test_heartbeat_extends_lease_and_reports_state(conn):
+    job_id = job_queue.submit(conn, [])
+    job = job_queue.lease(conn, "w1", "0")
+    conn.execute("UPDATE jobs SET lease_expires = ? WHERE id = ?", (time.time() + 1, job_id))
+    assert job_queue.heartbeat(conn, job_id, "w1") == "running"
+    assert state(conn, job_id)["lease_expires"] > job["lease_expires"] - 1
+
+
+def test_heartbeat_reports_lost_after_requeue(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    expire_leases(conn)
+    assert job_queue.heartbeat(conn, job_id, "w1") == "lost"
+
+
+def test_expired_lease_is_requeued(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    assert job_queue.requeue_expired(conn) == []
+    assert expire_leases(conn) == [job_id]
+    row = state(conn, job_id)
+    assert row["state"] == "queued"
+    assert row["worker"] is None
+    assert row["attempts"] == 1
+    assert job_queue.lease(conn, "w2", "0")["attempts"] == 2
+
+
+def test_expired_lease_fails_after_max_attempts(conn):
+    job_id = job_queue.submit(conn, [])
+    for _ in range(job_queue.MAX_ATTEMPTS):
+        assert job_queue.lease(conn, "w1", "0")["id"] == job_id
+        expire_leases(conn)
+    row = state(conn, job_id)
+    assert row["state"] == "failed"
+    assert row["finished_at"] is not None
+    assert job_queue.lease(conn, "w1", "0") is None
+
+
+def test_cancel_queued_job(conn):
+    job_id = job_queue.submit(conn, [])
+    assert job_queue.cancel(conn, job_id) == "cancelled"
+    assert job_queue.lease(conn, "w1", "0") is None
+
+
+def test_cancel_running_job_is_cancelled_when_worker_finishes(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    assert job_queue.cancel(conn, job_id) == "cancelling"
+    assert job_queue.heartbeat(conn, job_id, "w1") == "cancelling"
+    job_queue.finish(conn, job_id, "w1", -15)
+    assert state(conn, job_id)["state"] == "cancelled"
+
+
+def test_cancelling_job_with_expired_lease_is_cancelled(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    job_queue.cancel(conn, job_id)
+    expire_leases(conn)
+    assert state(conn, job_id)["state"] == "cancelled"
+
+
+def test_cancel_unknown_and_finished_jobs(conn):
+    assert job_queue.cancel(conn, 999) is None
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    job_queue.finish(conn, job_id, "w1", 0)
+    assert job_queue.cancel(conn, job_id) == "succeeded"
+
+
+def test_release_requeues_without_failing(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    job_queue.release(conn, job_id, "w1")
+    row = state(conn, job_id)
+    assert row["state"] == "queued"
+    assert row["worker"] is None
+
+
+def test_release_of_cancelling_job_cancels_it(conn):
+    job_id = job_queue.submit(conn, [])
+    job_queue.lease(conn, "w1", "0")
+    job_queue.cancel(conn, job_id)
+    job_queue.release(conn, job_id, "w1")
+    assert state(conn, job_id)["state"] == "cancelled"
+
+
+def test_set_priority_only_for_queued_jobs(conn):
+    first = job_queue.submit(conn, [])
+    second = job_queue.submit(conn, [])
+    assert job_queue.set_priority(conn, second, 10)
+    assert job_queue.lease(conn, "w1", "0")["id"] == second
+    assert not job_queue.set_priority(conn, second, 0)
+    assert job_queue.lease(conn, "w1", "1")["id"] == first
+
+
+def _alive(pid):
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return False
+    # Zombies are dead; they only wait for init to reap them
+    return stat.rsplit(")", 1)[1].split()[0] != "Z"
+
+
+def _cmdline(pid):
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode()
+    except OSError:
+        return ""
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="PR_SET_PDEATHSIG is Linux-only")
+def test_job_dies_with_killed_worker(tmp_path):
+    parent_script = textwrap.dedent(f"""
+        import subprocess, sys, time
+        sys.path.insert(0, {str(REPO_DIR)!r})
+        from child_launcher import launch_command
+        child = subprocess.Popen(
+            launch_command([sys.executable, "-c", "import time; time.sleep(60)"]),
+            start_new_session=True
+        )
+        print(child.pid, flush=True)
+        time.sleep(60)
+    """)
+    parent = subprocess.Popen([sys.executable, "-c", parent_script], stdout=subprocess.PIPE, text=True)
+    child_pid = int(parent.stdout.readline())
+    # The launcher has exec'd the command once the command line changes
+    deadline = time.time() + 10
+    while "child_launcher" in _cmdline(child_pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert _alive(child_pid)
+    assert "time.sleep(60)" in _cmdline(child_pid)
+
+    parent.send_signal(signal.SIGKILL)
+    parent.wait()
+    deadline = time.time() + 10
+    while _alive(child_pid) and time.time() < deadline:
+        time.sleep(0.1)
+    assert not _alive(child_pid)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the launcher is Linux-only")
+def test_launcher_passes_through_exit_status_and_output():
+    result = subprocess.run(
+        launch_command([sys.executable, "-c", "import sys; print('hello'); sys.exit(3)"]),
+        capture_output=True, text=True
+    )
+    assert result.returncode == 3
+    assert result.stdout == "hello\n"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the launcher is Linux-only")
+def test_launcher_pins_command_to_cpus():
+    cpu = min(os.sched_getaffinity(0))
+    result = subprocess.run(
+        launch_command([sys.executable, "-c", "import os; print(sorted(os.sched_getaffinity(0)))"], cpus=[cpu]),
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout == f"[{cpu}]\n"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the launcher is Linux-only")
+def test_launcher_refuses_to_start_for_a_dead_parent():
+    result = subprocess.run(
+        [sys.executable, "-S", str(REPO_DIR / "child_launcher.py"), "--parent", "1", "--", "true"]
+    )
+    assert result.returncode == 1
+
+
+def test_stop_process_group_stops_grandchildren():
+    script = "import subprocess, sys, time; " \
+             "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); " \
+             "print(p.pid, flush=True); time.sleep(60)"
+    process = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, text=True,
+                               start_new_session=True)
+    grandchild_pid = int(process.stdout.readline())
+    job_queue.stop_process_group(process, grace_seconds=5)
+    deadline = time.time() + 10
+    while _alive(grandchild_pid) and time.time() < deadline:
+        time.sleep(0.1)
+    assert process.returncode == -signal.SIGTERM
+    assert not _alive(grandchild_pid)
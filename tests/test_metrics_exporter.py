@@ -0,0 +1,73 @@
+"""Tests for the Prometheus metrics endpoint and per-run telemetry"""
+
+import subprocess
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import run_telemetry  # noqa: E402
+from metrics_exporter import MetricsRegistry, start_metrics_server  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    registry = MetricsRegistry()
+    server = start_metrics_server(registry, port=0)
+    yield registry, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def scrape(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        return response.read().decode("utf-8")
+
+
+def test_metrics_endpoint_serves_recorded_runs(server):
+    registry, url = server
+    registry.record_run({
+        "success": True,
+        "wall_seconds": 42.0,
+        "stage_seconds": {"design": 30.0, "alphafold": 12.0},
+        "design_samples": 4,
+        "successful_designs": 1,
+    })
+    registry.record_run({"success": False, "wall_seconds": 5.0})
+
+    body = scrape(url + "/metrics")
+    assert "# TYPE boltz_runs_total counter" in body
+    assert 'boltz_runs_total{status="succeeded"} 1' in body
+    assert 'boltz_runs_total{status="failed"} 1' in body
+    assert "boltz_designs_completed_total 4" in body
+    assert "boltz_success_rate 0.25" in body
+    assert 'boltz_stage_latency_seconds_bucket{le="30.0",stage="design"} 1' in body
+    assert "boltz_run_latency_seconds_count 2" in body
+    assert "boltz_device_metrics_available" in body
+
+
+def test_metrics_endpoint_rejects_other_paths(server):
+    _, url = server
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url + "/other", timeout=5)
+    assert error.value.code == 404
+
+
+def test_wait_with_peak_rss_measures_the_child():
+    process = subprocess.Popen([sys.executable, "-c", "data = bytearray(64 * 1024 ** 2); raise SystemExit(3)"])
+    returncode, peak = run_telemetry.wait_with_peak_rss(process)
+    assert returncode == 3
+    assert process.returncode == 3
+    assert peak >= 64 * 1024 ** 2
+
+
+def test_wait_with_peak_rss_without_wait4(monkeypatch):
+    monkeypatch.delattr(run_telemetry.os, "wait4", raising=False)
+    process = subprocess.Popen([sys.executable, "-c", "raise SystemExit(2)"])
+    assert run_telemetry.wait_with_peak_rss(process) == (2, None)
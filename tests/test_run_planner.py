@@ -0,0 +1,102 @@
+"""Tests for the run planner's duration parsing and cost-model fitting"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import run_planner  # noqa: E402
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("3600", 3600.0),
+    ("90.5", 90.5),
+    ("4h", 4 * 3600.0),
+    ("90m", 90 * 60.0),
+    ("2h30m", 2 * 3600.0 + 30 * 60.0),
+    ("1d 2h", 86400.0 + 7200.0),
+    (" 45S ", 45.0),
+    ("1.5h", 5400.0),
+])
+def test_parse_duration(text, seconds):
+    assert run_planner.parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["", "h", "4x", "4h junk", "-1h", "2h30"])
+def test_parse_duration_rejects_garbage(text):
+    with pytest.raises(ValueError):
+        run_planner.parse_duration(text)
+
+
+def test_solve_recovers_exact_coefficients():
+    rows = [[1.0, x, x * x] for x in (1.0, 2.0, 3.0, 5.0, 8.0)]
+    targets = [4.0 + 0.5 * x + 2.0 * x * x for _, x, _ in rows]
+    assert run_planner._solve(rows, targets) == pytest.approx([4.0, 0.5, 2.0])
+
+
+def test_solve_handles_columns_of_very_different_scale():
+    rows = [[1.0, t * 1e6] for t in (1.0, 2.0, 4.0)]
+    targets = [30.0 + 2e-6 * x for _, x in rows]
+    assert run_planner._solve(rows, targets) == pytest.approx([30.0, 2e-6])
+
+
+def test_solve_degenerate_history_stays_finite():
+    # Every run the same size: the two columns are identical
+    coefficients = run_planner._solve([[1.0, 1.0]] * 3, [10.0] * 3)
+    assert coefficients is not None
+    assert sum(coefficients) == pytest.approx(10.0)
+
+
+def record(samples, target_residues, wall_seconds, device="cuda:0", cpu_threads=None):
+    return {
+        "success": True,
+        "device": device,
+        "design_samples": samples,
+        "target_residues": target_residues,
+        "length_min": 100,
+        "length_max": 100,
+        "wall_seconds": wall_seconds,
+        "cpu_threads": cpu_threads,
+    }
+
+
+def wall_seconds(samples, tokens, threads=1):
+    return 60.0 + samples / threads * (2.0 + 0.01 * tokens + 1e-4 * tokens ** 2)
+
+
+HISTORY = [(samples, residues) for samples in (1, 4, 10) for residues in (50, 150, 300)]
+
+
+def test_fit_wall_time_recovers_quadratic_model():
+    records = [record(s, r, wall_seconds(s, r + 100)) for s, r in HISTORY]
+    model = run_planner.fit_wall_time(records, (20, 500, None))
+    assert model.name == "quadratic"
+    assert model.coefficients == pytest.approx([60.0, 2.0, 0.01, 1e-4])
+    assert model.predict(20, 500, None) == pytest.approx(wall_seconds(20, 500))
+    assert model.relative_error == pytest.approx(0.02)
+    assert model.conservative(20, 500, None) > model.predict(20, 500, None)
+
+
+def test_fit_wall_time_falls_back_with_short_history():
+    records = [record(s, 200, wall_seconds(s, 300)) for s in (2, 5, 9)]
+    model = run_planner.fit_wall_time(records, (10, 300, None))
+    assert model.name == "tokens^2"
+    assert model.relative_error == run_planner.DEFAULT_RELATIVE_ERROR
+
+    model = run_planner.fit_wall_time(records[:1], (10, 300, None))
+    assert model.name == "rate"
+    assert model.predict(2, 300, None) == pytest.approx(records[0]["wall_seconds"])
+
+
+def test_fit_wall_time_shares_cpu_work_among_threads():
+    records = [record(s, r, wall_seconds(s, r + 100, threads=t), device="cpu", cpu_threads=t)
+               for (s, r), t in zip(HISTORY, (1, 2, 4, 8, 1, 2, 4, 8, 16))]
+    model = run_planner.fit_wall_time(records, (10, 300, 4))
+    assert model.name == "quadratic"
+    assert model.predict(10, 300, 4) == pytest.approx(wall_seconds(10, 300, threads=4))
+
+
+def test_fit_wall_time_without_history():
+    assert run_planner.fit_wall_time([], (10, 300, None)) is None
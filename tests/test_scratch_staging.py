@@ -0,0 +1,158 @@
+"""Tests for streaming scratch artifacts to the destination directory"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import scratch_staging  # noqa: E402
+from scratch_staging import COMPLETE_MARKER, MANIFEST_NAME, ScratchUploader, verify_manifest  # noqa: E402
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return tmp_path / "scratch", tmp_path / "final"
+
+
+def test_sweep_copies_only_retained_files(dirs):
+    scratch, final = dirs
+    write(scratch / "run_03_af_pdb_success" / "design.pdb", "ATOM")
+    write(scratch / "scores.csv", "name,iptm\n")
+    write(scratch / "run_02_design_af3" / "tmp.bin", "x")
+    write(scratch / ".hidden.csv", "x")
+    uploader = ScratchUploader(scratch, final, retention="final")
+    uploader.sweep(settle_seconds=0)
+    assert sorted(uploader.uploaded) == ["run_03_af_pdb_success/design.pdb", "scores.csv"]
+    assert (final / "run_03_af_pdb_success" / "design.pdb").read_text() == "ATOM"
+    assert not (final / "run_02_design_af3").exists()
+
+
+def test_sweep_waits_for_files_to_settle(dirs):
+    scratch, final = dirs
+    write(scratch / "scores.csv", "a")
+    uploader = ScratchUploader(scratch, final, settle_seconds=3600)
+    uploader.sweep()
+    assert uploader.uploaded == {}
+
+
+def test_changed_file_is_reuploaded_and_counted_once(dirs):
+    scratch, final = dirs
+    path = write(scratch / "scores.csv", "a")
+    uploader = ScratchUploader(scratch, final)
+    uploader.sweep(settle_seconds=0)
+    path.write_text("abc")
+    os.utime(path, (0, path.stat().st_mtime - 60))
+    uploader.sweep(settle_seconds=0)
+    assert (final / "scores.csv").read_text() == "abc"
+    assert uploader.bytes_uploaded == 3
+
+
+def test_file_vanishing_during_sweep_is_skipped(dirs, monkeypatch):
+    scratch, final = dirs
+    write(scratch / "a.csv", "a")
+    gone = write(scratch / "b.csv", "b")
+    real_stat = Path.stat
+
+    def stat(self, *args, **kwargs):
+        if self == gone:
+            raise FileNotFoundError(self)
+        return real_stat(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "stat", stat)
+    uploader = ScratchUploader(scratch, final)
+    uploader.sweep(settle_seconds=0)
+    assert sorted(uploader.uploaded) == ["a.csv"]
+    assert uploader.errors == {}
+
+
+def test_file_deleted_before_copy_is_not_an_error(dirs, monkeypatch):
+    scratch, final = dirs
+    write(scratch / "a.csv", "a")
+
+    def copy(source, destination):
+        raise FileNotFoundError(source)
+
+    monkeypatch.setattr(scratch_staging, "copy_with_checksum", copy)
+    uploader = ScratchUploader(scratch, final)
+    summary = uploader.finish(success=True)
+    assert summary["errors"] == []
+    assert (final / COMPLETE_MARKER).exists()
+
+
+def test_finish_writes_manifest_and_complete_marker(dirs):
+    scratch, final = dirs
+    write(scratch / "scores.csv", "name,iptm\n")
+    write(scratch / "run_03_af_pdb_success" / "design.pdb", "ATOM")
+    summary = ScratchUploader(scratch, final).start().finish(success=True)
+
+    lines = (final / MANIFEST_NAME).read_text().splitlines()
+    expected = hashlib.sha256(b"ATOM").hexdigest()
+    assert lines[0] == f"{expected}  run_03_af_pdb_success/design.pdb"
+    assert lines[1].endswith("  scores.csv")
+    assert summary["files"] == 2
+    assert summary["bytes"] == len("name,iptm\n") + len("ATOM")
+    assert summary["errors"] == []
+    assert (final / COMPLETE_MARKER).exists()
+    assert verify_manifest(final) == []
+
+
+def test_failed_run_gets_no_complete_marker(dirs):
+    scratch, final = dirs
+    write(scratch / "scores.csv", "a")
+    ScratchUploader(scratch, final).finish(success=False)
+    assert (final / MANIFEST_NAME).exists()
+    assert not (final / COMPLETE_MARKER).exists()
+
+
+def test_copy_error_blocks_complete_marker(dirs, monkeypatch):
+    scratch, final = dirs
+    write(scratch / "scores.csv", "a")
+
+    def copy(source, destination):
+        raise PermissionError(destination)
+
+    monkeypatch.setattr(scratch_staging, "copy_with_checksum", copy)
+    summary = ScratchUploader(scratch, final).finish(success=True)
+    assert len(summary["errors"]) == 1
+    assert not (final / COMPLETE_MARKER).exists()
+
+
+def test_corrupt_copy_blocks_complete_marker(dirs, monkeypatch):
+    scratch, final = dirs
+    write(scratch / "scores.csv", "a")
+    real_copy = scratch_staging.copy_with_checksum
+
+    def copy(source, destination):
+        checksum = real_copy(source, destination)
+        destination.write_text("corrupted")
+        return checksum
+
+    monkeypatch.setattr(scratch_staging, "copy_with_checksum", copy)
+    summary = ScratchUploader(scratch, final).finish(success=True)
+    assert summary["errors"] == [f"scores.csv: does not match {MANIFEST_NAME}"]
+    assert not (final / COMPLETE_MARKER).exists()
+
+
+def test_verify_manifest_reports_missing_and_changed_files(dirs):
+    scratch, final = dirs
+    write(scratch / "a.csv", "a")
+    write(scratch / "b.csv", "b")
+    ScratchUploader(scratch, final).finish(success=True)
+    (final / "a.csv").write_text("changed")
+    (final / "b.csv").unlink()
+    assert verify_manifest(final) == ["a.csv", "b.csv"]
+
+
+def test_unknown_retention_policy_is_rejected(dirs):
+    with pytest.raises(ValueError):
+        ScratchUploader(*dirs, retention="everything")
@@ -0,0 +1,93 @@
+"""Tests for binding-site ranking and site checks on the benchmark target crop"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(REPO_DIR / "benchmarks"))
+
+pytest.importorskip("numpy")
+
+import target_analysis  # noqa: E402
+from run_benchmarks import SOURCE_PDB, make_target_crop  # noqa: E402
+from run_binder_generation import _without_flags  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def analysis(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("target")
+    pdb = make_target_crop(SOURCE_PDB, tmp_path / "target.pdb")
+    return target_analysis.analyze_target(pdb, ["A"], cache_dir=tmp_path / "cache")
+
+
+def test_analysis_covers_crop(analysis):
+    assert analysis["chains"] == ["A"]
+    assert len(analysis["residues"]) == 40
+    assert analysis["residues"][0]["resname"] == "PRO"
+    assert set(analysis["surface"]) <= set(range(40))
+
+
+def test_analysis_is_cached(analysis):
+    pdb = Path(analysis["pdb"])
+    again = target_analysis.analyze_target(pdb, ["A"], cache_dir=pdb.parent / "cache")
+    assert again["cached"]
+    assert again["residues"] == analysis["residues"]
+
+
+def test_rank_patches_orders_distinct_sites(analysis):
+    ranked = target_analysis.rank_patches(analysis, top_k=3)
+    assert [site["rank"] for site in ranked] == [1, 2, 3]
+    assert [site["score"] for site in ranked] == sorted((site["score"] for site in ranked), reverse=True)
+    assert ranked[0]["contacts"] == "38,39,40"
+    assert all(site["area"] >= target_analysis.MIN_PATCH_AREA for site in ranked)
+    members = [set(site["members"].split(",")) for site in ranked]
+    for i, a in enumerate(members):
+        for b in members[i + 1:]:
+            assert len(a & b) / len(a | b) <= 0.5
+
+
+def test_rank_patches_respects_min_area(analysis):
+    assert target_analysis.rank_patches(analysis, min_area=1e9) == []
+
+
+def test_top_ranked_site_passes_its_own_check(analysis):
+    site = target_analysis.rank_patches(analysis, top_k=1)[0]
+    report = target_analysis.evaluate_site(analysis, site["contacts"], site["chain"])
+    assert report["problems"] == []
+    assert report["components"] == 1
+    assert report["exposed_fraction"] == 1.0
+
+
+def test_site_spread_across_the_target_is_rejected(analysis):
+    report = target_analysis.evaluate_site(analysis, "1,40")
+    assert report["span"] > target_analysis.MAX_SITE_SPAN
+    assert report["components"] == 2
+    assert len(report["problems"]) == 2
+
+
+def test_buried_site_is_rejected(analysis):
+    buried = dict(analysis, surface=[])
+    report = target_analysis.evaluate_site(buried, "1,2,3")
+    assert report["exposed_fraction"] == 0.0
+    assert "solvent exposed" in report["problems"][0]
+
+
+@pytest.mark.parametrize("contacts, chain, problem", [
+    ("1,2,999", None, "residue A999 is not in the target"),
+    ("x,3", None, "'x' is not a residue position"),
+    ("", None, "no contact residues given"),
+    ("1", "B", "residue B1 is not in the target"),
+])
+def test_invalid_contacts_are_reported(analysis, contacts, chain, problem):
+    report = target_analysis.evaluate_site(analysis, contacts, chain)
+    assert problem in report["problems"]
+
+
+def test_queued_site_jobs_drop_per_run_flags():
+    argv = ["--pdb", "t.pdb", "--top-sites", "3", "--queue-sites", "--suffix=x",
+            "--metrics-port", "9100", "--metrics-linger=30", "--gpu_id", "0"]
+    assert _without_flags(argv, {"--top-sites", "--suffix", "--metrics-port", "--metrics-linger"},
+                          {"--queue-sites"}) == ["--pdb", "t.pdb", "--gpu_id", "0"]